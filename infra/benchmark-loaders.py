@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the CSV loaders
+
+Runs import-support-tickets-csv.py and upload-defects-csv.py end to end
+against the in-process stand-ins from loader_stand_ins.py instead of Azure
+SQL and Cosmos DB, over synthetic CSVs of 10k, 100k and 1M rows. Each loader
+mode runs in its own process, which reports rows/sec, peak memory and the
+number of round trips it made, so per-row, batched, parallel and async
+strategies can be compared on one machine.
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib.util
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is reported as unknown
+    resource = None
+
+from csv_sources import open_csv_text, resolve_csv_path
+from loader_stand_ins import FaultProfile, StandIns
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = '10000,100000,1000000'
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(),
+                                'csv-loader-benchmark')
+# Values the loaders validate at startup; the stand-ins ignore them
+STAND_IN_ENVIRONMENT = {
+    'DB_SERVER': 'stand-in.database.windows.net',
+    'DB_DATABASE': 'BenchmarkDB',
+    'DB_USERNAME': 'benchmark',
+    'DB_PASSWORD': 'benchmark',
+    'COSMOS_ENDPOINT': 'https://stand-in.documents.azure.com:443/',
+}
+# Counters from the loaders' own LoadMetrics worth reporting
+REPORTED_COUNTERS = ('retries', 'connect_retries', 'throttled_retries',
+                     'request_charge', 'control_increases',
+                     'control_decreases')
+
+
+@dataclass
+class LoaderSpec:
+    """A loader script and the sample data its synthetic CSVs copy"""
+    script: str
+    sample_csv: str
+    file_prefix: str
+
+
+LOADERS = {
+    'import': LoaderSpec('import-support-tickets-csv.py',
+                         os.path.join('data', 'Support_tickets.csv'),
+                         'support_tickets'),
+    'upload': LoaderSpec('upload-defects-csv.py',
+                         os.path.join('data', 'defects_data_with_company.csv'),
+                         'defects'),
+}
+
+
+def loader_modes(args: argparse.Namespace) -> Dict[str, Dict[str, List[str]]]:
+    """Command-line options for every benchmarked mode of each loader"""
+    workers = ['--workers', str(args.workers)]
+    # Kept with the synthetic CSVs, so batch-cached reuses what the
+    # batch-cache-build run before it wrote
+    cache = ['--cache', '--cache-dir', cache_dir(args)]
+    return {
+        'import': {
+            'row': ['--mode', 'row'],
+            'batch': ['--mode', 'batch'],
+            'batch-fixed': ['--mode', 'batch', '--no-adaptive'],
+            'staging': ['--mode', 'staging'],
+            'row-parallel': ['--mode', 'row', *workers],
+            'batch-parallel': ['--mode', 'batch', *workers],
+            'batch-multiprocess': ['--mode', 'batch', *workers,
+                                   '--parse-workers', str(args.workers)],
+            'batch-cache-build': ['--mode', 'batch', *cache],
+            'batch-cached': ['--mode', 'batch', *cache],
+        },
+        'upload': {
+            'sequential': [],
+            'batch': ['--batch'],
+            'batch-fixed': ['--batch', '--no-adaptive'],
+            'batch-cache-build': ['--batch', *cache],
+            'batch-cached': ['--batch', *cache],
+            'async': ['--async-upload',
+                      '--max-in-flight', str(args.max_in_flight)],
+            'async-batch': ['--async-upload', '--batch',
+                            '--max-in-flight', str(args.max_in_flight)],
+        },
+    }
+
+
+def cache_dir(args: argparse.Namespace) -> str:
+    """Where the loaders' column caches of the synthetic CSVs are kept"""
+    return os.path.join(args.data_dir, 'column-cache')
+
+
+def synthetic_csv(spec: LoaderSpec, rows: int, data_dir: str) -> str:
+    """Path of a ``rows``-row CSV for ``spec``, generating it if needed
+
+    Rows cycle through the shipped sample data with the first (id) column
+    renumbered, so every row is new to the target but keeps realistic values.
+    """
+    path = os.path.join(data_dir, f"{spec.file_prefix}_{rows}.csv")
+    if os.path.exists(path):
+        return path
+
+    sample_path = resolve_csv_path(os.path.join(script_dir, spec.sample_csv))
+    if sample_path is None:
+        raise FileNotFoundError(f"Sample data {spec.sample_csv} not found")
+    with open_csv_text(sample_path) as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        sample = list(reader)
+    first_id = int(sample[0][0])
+
+    os.makedirs(data_dir, exist_ok=True)
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for row_number, row in enumerate(
+                itertools.islice(itertools.cycle(sample), rows)):
+            writer.writerow([first_id + row_number, *row[1:]])
+    os.replace(temp_file, path)
+    return path
+
+
+def load_loader(spec: LoaderSpec):
+    """Import a loader script by path; its file name is not a module name"""
+    path = os.path.join(script_dir, spec.script)
+    module_name = os.path.splitext(spec.script)[0].replace('-', '_')
+    module_spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(module_spec)
+    # Registered so worker processes can unpickle the loader's functions
+    sys.modules[module_name] = module
+    module_spec.loader.exec_module(module)
+    return module
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident memory of this process so far"""
+    # On Linux ru_maxrss survives exec, so a child would report its parent's
+    # peak; VmHWM only covers this process's own address space
+    try:
+        with open('/proc/self/status', encoding='ascii') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def count_dead_letters(path: str) -> int:
+    """Rows a loader wrote to its dead-letter CSV; 0 if it wrote none"""
+    try:
+        with open(path, newline='', encoding='utf-8') as file:
+            return max(0, sum(1 for _ in csv.reader(file)) - 1)
+    except FileNotFoundError:
+        return 0
+
+
+def run_benchmark(task: Dict) -> Dict:
+    """Run one loader mode over one CSV against the stand-ins
+
+    Called in a fresh process per task, so module state, caches and peak
+    memory from one mode never leak into the next.
+    """
+    stand_ins = StandIns(FaultProfile(**task['profile']))
+    stand_ins.install()
+    os.environ.update(STAND_IN_ENVIRONMENT)
+    spec = LOADERS[task['loader']]
+    loader = load_loader(spec)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Keep checkpoints, manifests and dead letters out of the real ones
+        # next to the scripts, so every run starts from an empty target
+        state_file = ('--checkpoint-file' if task['loader'] == 'import'
+                      else '--manifest-file')
+        sys.argv = [spec.script, '--csv-file', task['csv_file'],
+                    state_file, os.path.join(work_dir, 'state.json'),
+                    '--dead-letter-file',
+                    os.path.join(work_dir, 'dead-letter.csv'),
+                    *task['options']]
+        started = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, \
+                contextlib.redirect_stdout(devnull):
+            loader.main()
+        seconds = time.perf_counter() - started
+        dead_letters = count_dead_letters(
+            os.path.join(work_dir, 'dead-letter.csv'))
+
+    metrics = loader.METRICS.summary()
+    round_trips = stand_ins.round_trips.total()
+    return {
+        'loader': task['loader'],
+        'mode': task['mode'],
+        'rows': task['rows'],
+        'rows_loaded': metrics['rows_loaded'],
+        'rows_written': stand_ins.rows_written(),
+        'dead_letters': dead_letters,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(task['rows'] / seconds, 1),
+        'peak_memory_mb': peak_memory_mb(),
+        'round_trips': round_trips,
+        'rows_per_round_trip': round(task['rows'] / round_trips, 1)
+        if round_trips else 0.0,
+        'requests': stand_ins.round_trips.summary(),
+        'counters': {name: metrics['counters'][name]
+                     for name in REPORTED_COUNTERS
+                     if name in metrics['counters']},
+        'stages': metrics['stages'],
+    }
+
+
+def run_in_subprocess(task: Dict) -> Dict:
+    """Run one task in a child process and return its result"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-one',
+         json.dumps(task)],
+        capture_output=True, text=True, cwd=script_dir)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = completed.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else
+                           f"exited with status {completed.returncode}")
+    return json.loads(lines[-1])
+
+
+def print_results(results: List[Dict], profile: FaultProfile) -> None:
+    """Print the comparison table for every completed run"""
+    print(f"\n📊 Benchmark results ({profile.latency_ms:g}ms per round trip, "
+          f"{profile.disconnect_rate:.1%} disconnects, "
+          f"{profile.throttle_rate:.1%} throttled):")
+    print(f"   {'loader':<7} {'mode':<18} {'rows':>10} {'loaded':>10} "
+          f"{'rows/sec':>10} {'peak MB':>8} {'round trips':>12} "
+          f"{'rows/trip':>9}")
+    for result in results:
+        peak = result['peak_memory_mb']
+        print(f"   {result['loader']:<7} {result['mode']:<18} "
+              f"{result['rows']:>10,} {result['rows_loaded']:>10,} "
+              f"{result['rows_per_second']:>10,.0f} "
+              f"{'n/a' if peak is None else f'{peak:,.1f}':>8} "
+              f"{result['round_trips']:>12,} "
+              f"{result['rows_per_round_trip']:>9,.1f}")
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the CSV loaders offline against in-process "
+                    "stand-ins for Azure SQL and Cosmos DB")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="Comma-separated synthetic CSV sizes in rows "
+                             f"(default: {DEFAULT_SIZES})")
+    parser.add_argument("--loaders", nargs="+", choices=sorted(LOADERS),
+                        default=sorted(LOADERS),
+                        help="Loaders to benchmark (default: both)")
+    parser.add_argument("--modes", nargs="+",
+                        help="Only run these modes, e.g. row batch async "
+                             "(default: every mode of each loader)")
+    parser.add_argument("--latency-ms", type=float, default=1.0,
+                        help="Simulated latency of each round trip "
+                             "(default: 1.0)")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0,
+                        help="Fraction of round trips that drop the "
+                             "connection (default: 0)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="Fraction of Cosmos DB requests rejected with "
+                             "HTTP 429 (default: 0)")
+    parser.add_argument("--retry-after-ms", type=float, default=10.0,
+                        help="Retry-after delay sent with each 429 "
+                             "(default: 10)")
+    parser.add_argument("--provisioned-ru", type=float, default=0.0,
+                        help="Cosmos DB throughput in RU/s; requests beyond "
+                             "it are throttled, so the adaptive control has "
+                             "a capacity to grow into and back off from "
+                             "(default: 0, unlimited)")
+    parser.add_argument("--reject-rate", type=float, default=0.0,
+                        help="Fraction of SQL rows and Cosmos DB documents "
+                             "rejected as invalid, which the loaders must "
+                             "isolate and dead-letter (default: 0)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed for the injected failures (default: 0)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Workers, and parse processes, for the "
+                             "parallel import modes (default: 4)")
+    parser.add_argument("--max-in-flight", type=int, default=16,
+                        help="Requests in flight for the async upload modes "
+                             "(default: 16)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR,
+                        help="Where synthetic CSVs are generated and reused "
+                             f"(default: {DEFAULT_DATA_DIR})")
+    parser.add_argument("--output",
+                        help="Also write every result as JSON to this path")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    """Generate the inputs, run every selected mode and report"""
+    args = parse_arguments()
+    if args.run_one:
+        print(json.dumps(run_benchmark(json.loads(args.run_one))))
+        return
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',')]
+    except ValueError:
+        print(f"❌ --sizes must be comma-separated row counts: {args.sizes}")
+        return
+    if any(size < 1 for size in sizes):
+        print("❌ --sizes must all be at least 1")
+        return
+    profile = FaultProfile(args.latency_ms, args.disconnect_rate,
+                           args.throttle_rate, args.retry_after_ms, args.seed,
+                           reject_rate=args.reject_rate,
+                           provisioned_ru_per_second=args.provisioned_ru)
+    modes = loader_modes(args)
+    unknown_modes = set(args.modes or ()) - {
+        mode for name in args.loaders for mode in modes[name]}
+    if unknown_modes:
+        print(f"❌ Unknown modes: {', '.join(sorted(unknown_modes))}")
+        return
+
+    print("🏁 CSV loader benchmark (offline stand-ins)")
+    print("=" * 50)
+    results = []
+    for rows in sizes:
+        for name in args.loaders:
+            print(f"\n📄 Preparing {rows:,}-row {name} input...")
+            csv_file = synthetic_csv(LOADERS[name], rows, args.data_dir)
+            for mode, options in modes[name].items():
+                if args.modes and mode not in args.modes:
+                    continue
+                print(f"⏱️  {name} --{mode} over {rows:,} rows...")
+                if mode == 'batch-cache-build':
+                    # Time building the cache as well as loading from it
+                    shutil.rmtree(cache_dir(args), ignore_errors=True)
+                task = {
+                    'loader': name,
+                    'mode': mode,
+                    'rows': rows,
+                    'csv_file': csv_file,
+                    'options': options,
+                    'profile': asdict(profile),
+                }
+                try:
+                    result = run_in_subprocess(task)
+                except RuntimeError as e:
+                    print(f"❌ {name} {mode} failed: {e}")
+                    continue
+                results.append(result)
+                print(f"   ✅ {result['rows_per_second']:,.0f} rows/sec, "
+                      f"{result['round_trips']:,} round trips")
+                if result['rows_loaded'] != rows:
+                    print(f"   ⚠️  Loaded {result['rows_loaded']:,} of "
+                          f"{rows:,} rows")
+                counters = result['counters']
+                if ('control_increases' in counters
+                        or 'control_decreases' in counters):
+                    print(f"   🎛️  Adaptive control grew "
+                          f"{counters.get('control_increases', 0):,.0f} and "
+                          f"backed off "
+                          f"{counters.get('control_decreases', 0):,.0f} times")
+                rejected = result['requests'].get('rejected', 0)
+                if rejected or result['dead_letters']:
+                    print(f"   ☠️  {result['dead_letters']:,} rows "
+                          f"dead-lettered after {rejected:,} rejections")
+
+    print_results(results, profile)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"📝 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
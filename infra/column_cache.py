@@ -0,0 +1,298 @@
+"""
+Columnar cache of parsed, typed CSV rows shared by the CSV loaders.
+
+Loading the same CSV into several environments re-parses and re-converts
+identical text every time. With ``--cache`` each loader writes the typed
+result of its first parse to a local binary file, and later runs memory-map
+it and build rows straight from its columns.
+
+A cache file is named after the SHA-256 of the source file, so an edited
+source simply misses and is cached again, and the old file for that source
+is removed. The loader's schema string is stored too, so a change to the
+conversion code invalidates caches written by the old code.
+
+Layout: an 8-byte magic, then row groups of column buffers (8-byte aligned
+``array`` data and UTF-8 text), then a JSON footer describing every buffer,
+its length as 8 bytes and the magic again. Integers are int64 and floats
+float64. Text is dictionary-encoded within a group when its values repeat,
+as most categorical columns do, and stored as offsets plus one string
+otherwise. Files are written to a temporary name and renamed into place,
+so an interrupted build never leaves a cache that looks complete.
+"""
+
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MAGIC = b'CSVCOLS1'
+FORMAT_VERSION = 1
+TRAILER = struct.Struct('<Q')
+ALIGNMENT = 8
+# Rows per group; a loader builds one group's rows at a time
+GROUP_ROWS = 65536
+HASH_BLOCK_BYTES = 1024 * 1024
+COLUMN_KINDS = {'int': 'q', 'float': 'd', 'text': None}
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while True:
+            block = file.read(HASH_BLOCK_BYTES)
+            if not block:
+                return digest.hexdigest()
+            digest.update(block)
+
+
+def cache_file_path(cache_dir: str, source_path: str, loader: str,
+                    digest: str) -> str:
+    """Where the cache of ``source_path`` with this content is kept"""
+    name = os.path.basename(source_path)
+    return os.path.join(cache_dir, f"{name}.{loader}.{digest[:16]}.columns")
+
+
+def remove_stale_caches(cache_dir: str, source_path: str, loader: str,
+                        keep: str) -> int:
+    """Delete caches of earlier versions of a source; returns how many"""
+    pattern = cache_file_path(glob.escape(cache_dir), source_path, loader,
+                              '*')
+    removed = 0
+    for path in glob.glob(pattern):
+        if os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class ColumnCacheWriter:
+    """Writes row groups of typed columns to a new cache file
+
+    Use as a context manager: the file only replaces ``path`` when the block
+    finishes without an exception. ``columns`` is a list of (name, kind)
+    pairs, where kind is ``int``, ``float`` or ``text``.
+    """
+
+    def __init__(self, path: str, columns: Sequence[Tuple[str, str]],
+                 source_digest: str, schema: str,
+                 metadata: Optional[Dict] = None):
+        for name, kind in columns:
+            if kind not in COLUMN_KINDS:
+                raise ValueError(f"Unknown kind {kind!r} for column {name}")
+        self.path = path
+        self.columns = list(columns)
+        self.footer = {
+            'format': FORMAT_VERSION,
+            'source_digest': source_digest,
+            'schema': schema,
+            'columns': self.columns,
+            'rows': 0,
+            'metadata': metadata or {},
+            'groups': [],
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._temp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._temp_path, 'wb')
+        self._file.write(MAGIC)
+
+    def __enter__(self) -> 'ColumnCacheWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def add_group(self, values: Sequence[Sequence],
+                  extra: Optional[Dict] = None) -> None:
+        """Append one row group, given as one sequence of values per column
+
+        ``extra`` is stored with the group as JSON, for facts about its rows
+        that are not columns.
+        """
+        rows = len(values[0]) if values else 0
+        group = {'rows': rows, 'columns': [], 'extra': extra or {}}
+        for (name, kind), column in zip(self.columns, values):
+            if len(column) != rows:
+                raise ValueError(f"Column {name} has {len(column)} values, "
+                                 f"expected {rows}")
+            try:
+                if kind == 'text':
+                    group['columns'].append(self._write_text(column))
+                else:
+                    data = array(COLUMN_KINDS[kind], column).tobytes()
+                    group['columns'].append({
+                        'encoding': kind,
+                        'buffers': [self._write_buffer(data)],
+                    })
+            except (OverflowError, TypeError) as e:
+                raise ValueError(f"Column {name} cannot be cached as "
+                                 f"{kind}: {e}") from e
+        self.footer['groups'].append(group)
+        self.footer['rows'] += rows
+
+    def commit(self) -> None:
+        """Write the footer and move the finished file into place"""
+        footer = json.dumps(self.footer, separators=(',', ':')).encode()
+        self._file.write(footer)
+        self._file.write(TRAILER.pack(len(footer)))
+        self._file.write(MAGIC)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def discard(self) -> None:
+        """Drop a partly written file"""
+        self._file.close()
+        try:
+            os.remove(self._temp_path)
+        except OSError:
+            pass
+
+    def _write_buffer(self, data: bytes) -> List[int]:
+        padding = -self._file.tell() % ALIGNMENT
+        if padding:
+            self._file.write(b'\0' * padding)
+        offset = self._file.tell()
+        self._file.write(data)
+        return [offset, len(data)]
+
+    def _write_strings(self, values: Sequence[str]) -> List[List[int]]:
+        # Offsets count characters, so the text decodes once per buffer
+        offsets = array('q', [0])
+        total = 0
+        for value in values:
+            total += len(value)
+            offsets.append(total)
+        return [self._write_buffer(offsets.tobytes()),
+                self._write_buffer(''.join(values).encode('utf-8'))]
+
+    def _write_text(self, column: Sequence[Optional[str]]) -> Dict:
+        distinct = dict.fromkeys(value for value in column
+                                 if value is not None)
+        if len(distinct) <= len(column) // 2:
+            codes = {value: code for code, value in enumerate(distinct)}
+            codes[None] = -1
+            return {
+                'encoding': 'dictionary',
+                'buffers': [
+                    self._write_buffer(array(
+                        'i', [codes[value] for value in column]).tobytes()),
+                    *self._write_strings(list(distinct)),
+                ],
+            }
+        buffers = self._write_strings([value or '' for value in column])
+        if None in column:
+            buffers.append(self._write_buffer(bytes(
+                value is None for value in column)))
+        return {'encoding': 'plain', 'buffers': buffers}
+
+
+class ColumnCache:
+    """Read-only, memory-mapped view of a cache file
+
+    Columns are decoded one group at a time, straight from the mapping;
+    nothing is read until a group is asked for.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        try:
+            self.footer = self._read_footer()
+        except (ValueError, KeyError, TypeError, struct.error):
+            self.close()
+            raise
+        self.metadata: Dict = self.footer['metadata']
+        self.groups: List[Dict] = self.footer['groups']
+        self.row_count: int = self.footer['rows']
+        self.column_names = [name for name, _ in self.footer['columns']]
+
+    @classmethod
+    def open(cls, path: str, source_digest: str,
+             schema: str) -> Optional['ColumnCache']:
+        """Open a cache if it exists and was built from this source and
+        schema; None otherwise"""
+        try:
+            cache = cls(path)
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return None
+        if (cache.footer.get('format') != FORMAT_VERSION
+                or cache.footer.get('source_digest') != source_digest
+                or cache.footer.get('schema') != schema):
+            cache.close()
+            return None
+        return cache
+
+    def __enter__(self) -> 'ColumnCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        self._map.close()
+
+    def read_group(self, index: int,
+                   columns: Optional[Sequence[str]] = None) -> List[List]:
+        """Decode the named columns (default: all) of one row group"""
+        group = self.groups[index]
+        names = self.column_names if columns is None else columns
+        return [self._decode(group['columns'][self.column_names.index(name)])
+                for name in names]
+
+    def _read_footer(self) -> Dict:
+        size = len(self._map)
+        trailer_size = TRAILER.size + len(MAGIC)
+        if (size < len(MAGIC) + trailer_size
+                or self._map[:len(MAGIC)] != MAGIC
+                or self._map[size - len(MAGIC):] != MAGIC):
+            raise ValueError(f"{self.path} is not a complete column cache")
+        footer_size, = TRAILER.unpack_from(self._map, size - trailer_size)
+        footer_start = size - trailer_size - footer_size
+        return json.loads(self._map[footer_start:size - trailer_size])
+
+    def _numbers(self, buffer: List[int], typecode: str) -> List:
+        offset, length = buffer
+        with self._view[offset:offset + length] as raw, \
+                raw.cast(typecode) as typed:
+            return typed.tolist()
+
+    def _strings(self, offsets: List[int], data: List[int]) -> List[str]:
+        offset, length = data
+        with self._view[offset:offset + length] as raw:
+            text = str(raw, 'utf-8')
+        bounds = self._numbers(offsets, 'q')
+        return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def _decode(self, column: Dict) -> List:
+        encoding = column['encoding']
+        buffers = column['buffers']
+        if encoding in COLUMN_KINDS:
+            return self._numbers(buffers[0], COLUMN_KINDS[encoding])
+        if encoding == 'dictionary':
+            values = self._strings(buffers[1], buffers[2]) + [None]
+            # Code -1 picks the None appended above
+            return [values[code] for code in self._numbers(buffers[0], 'i')]
+        values = self._strings(buffers[0], buffers[1])
+        if len(buffers) > 2:
+            offset, length = buffers[2]
+            nulls = self._map[offset:offset + length]
+            values = [None if null else value
+                      for value, null in zip(values, nulls)]
+        return values
@@ -0,0 +1,94 @@
+"""
+Input helpers shared by the CSV loaders.
+
+Both import-support-tickets-csv.py and upload-defects-csv.py accept a plain
+``.csv``, a gzip-compressed ``.csv.gz``/``.gz``, or a ``.zip`` archive that
+contains the CSV. Compressed inputs are decompressed on the fly while the
+loader reads them; the extracted CSV is never written to disk.
+"""
+
+import gzip
+import io
+import os
+import struct
+import zipfile
+from typing import BinaryIO, Optional, TextIO
+
+COMPRESSED_SUFFIXES = ('.zip', '.gz')
+
+
+def is_compressed(path: str) -> bool:
+    """True when the path names a .zip or .gz input"""
+    return path.lower().endswith(COMPRESSED_SUFFIXES)
+
+
+def resolve_csv_path(path: str) -> Optional[str]:
+    """Return ``path`` if it exists, else a compressed sibling of it
+
+    ``data/Support_tickets.csv`` falls back to ``data/Support_tickets.zip``,
+    then ``data/Support_tickets.csv.gz`` and ``data/Support_tickets.csv.zip``,
+    so the repo's shipped archives work without an unzip step.
+    """
+    if os.path.exists(path):
+        return path
+    stem, _ = os.path.splitext(path)
+    for candidate in (f"{stem}.zip", f"{path}.gz", f"{path}.zip",
+                      f"{stem}.gz"):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def _select_zip_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    """Pick the CSV inside an archive, ignoring macOS resource forks"""
+    members = [info for info in archive.infolist()
+               if not info.is_dir() and not info.filename.startswith('__MACOSX/')]
+    csv_members = [info for info in members
+                   if info.filename.lower().endswith('.csv')]
+    candidates = csv_members or members
+    if len(candidates) != 1:
+        names = ', '.join(info.filename for info in candidates) or 'none'
+        raise ValueError(
+            f"Expected exactly one CSV in {archive.filename}, found: {names}")
+    return candidates[0]
+
+
+def uncompressed_size(path: str) -> int:
+    """Size in bytes of the CSV once decompressed, read from metadata
+
+    For gzip this is the trailer's ISIZE field, which wraps at 4 GiB; it is
+    only used for progress estimates, so that is accepted.
+    """
+    lowered = path.lower()
+    if lowered.endswith('.gz'):
+        with open(path, 'rb') as file:
+            file.seek(-4, os.SEEK_END)
+            return struct.unpack('<I', file.read(4))[0]
+    if lowered.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            return _select_zip_member(archive).file_size
+    return os.path.getsize(path)
+
+
+def open_csv_binary(path: str) -> BinaryIO:
+    """Open a CSV input as a binary stream, decompressing if needed
+
+    Offsets reported by ``tell()`` and accepted by ``seek()`` are positions in
+    the decompressed CSV. Seeking a compressed stream decompresses forward to
+    the target, which is still far cheaper than re-parsing the skipped rows.
+    """
+    lowered = path.lower()
+    if lowered.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if lowered.endswith('.zip'):
+        # The member stream keeps the archive's file handle alive after the
+        # ZipFile itself is closed
+        with zipfile.ZipFile(path) as archive:
+            return archive.open(_select_zip_member(archive))
+    return open(path, 'rb')
+
+
+def open_csv_text(path: str, encoding: str = 'utf-8') -> TextIO:
+    """Open a CSV input as text suitable for ``csv.reader``/``DictReader``"""
+    return io.TextIOWrapper(open_csv_binary(path), encoding=encoding,
+                            newline='')
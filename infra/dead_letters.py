@@ -0,0 +1,113 @@
+"""
+Dead-letter files for the records the CSV loaders reject.
+
+Records that fail conversion, or that the database refuses even after their
+batch has been split down to single rows, are collected by the loaders and
+written here in bulk. Each entry keeps the record's original values plus its
+record number (the header excluded, so a record whose quoted fields span
+lines still counts once), the field at fault (``*`` when it is the whole
+record) and the reason.
+
+A ``.csv`` dead-letter file has the source header followed by
+``error_record``, ``error_field`` and ``error_reason`` columns. Both loaders
+map columns by name and ignore extra ones, so the file can be corrected in
+place and replayed with ``--csv-file`` through the normal batched path. A
+``.jsonl`` file holds one JSON object per rejected record, for tooling.
+"""
+
+import csv
+import json
+import os
+import threading
+from typing import List, Mapping, Optional, Sequence, Union
+
+DEAD_LETTER_COLUMNS = ('error_record', 'error_field', 'error_reason')
+# Error columns a replayed file may carry, including those of older files
+REPLAYED_COLUMNS = {*DEAD_LETTER_COLUMNS, 'error_line'}
+WHOLE_RECORD = '*'
+# Rejected records buffered before they are written out together
+FLUSH_EVERY = 500
+
+Record = Union[Mapping[str, Optional[str]], Sequence[Optional[str]]]
+
+
+class DeadLetterFile:
+    """Buffers rejected records and appends them to a CSV or JSONL file
+
+    A run that starts afresh replaces any dead letters from an earlier run;
+    ``append`` keeps them, for runs that resume where another stopped. The
+    file is only created once something is rejected.
+    """
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None,
+                 append: bool = False):
+        self.path = path
+        self.columns = None
+        self._positions = None
+        if columns is not None:
+            self._set_columns(list(columns))
+        self.jsonl = path.lower().endswith(('.jsonl', '.json'))
+        self.count = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        if not append and os.path.exists(path):
+            os.remove(path)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, record_number: Optional[int], field: str, reason: str,
+            record: Record) -> None:
+        """Queue one rejected record; ``record`` is a dict or a list of
+        values in ``columns`` order"""
+        with self._lock:
+            if self.columns is None and isinstance(record, Mapping):
+                self._set_columns(list(record))
+            self._pending.append((record_number, field, reason, record))
+            self.count += 1
+            if len(self._pending) < FLUSH_EVERY:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Write every queued record in one append"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            is_new = not os.path.exists(self.path)
+            with open(self.path, 'a', encoding='utf-8', newline='') as file:
+                if self.jsonl:
+                    file.writelines(json.dumps(self._as_json(entry)) + '\n'
+                                    for entry in pending)
+                    return
+                writer = csv.writer(file)
+                if is_new:
+                    writer.writerow([*self.columns, *DEAD_LETTER_COLUMNS])
+                writer.writerows(self._as_row(entry) for entry in pending)
+
+    def _set_columns(self, columns: List[str]) -> None:
+        # A replayed dead-letter file already has error columns; they are
+        # replaced, not repeated
+        self._positions = [index for index, column in enumerate(columns)
+                           if column not in REPLAYED_COLUMNS]
+        self.columns = [columns[index] for index in self._positions]
+
+    def _values(self, record: Record) -> List[Optional[str]]:
+        if isinstance(record, Mapping):
+            return [record.get(column) for column in self.columns]
+        return [record[index] if index < len(record) else None
+                for index in self._positions]
+
+    def _as_row(self, entry) -> List[Optional[str]]:
+        record_number, field, reason, record = entry
+        return [*self._values(record), record_number, field, reason]
+
+    def _as_json(self, entry) -> dict:
+        record_number, field, reason, record = entry
+        return {
+            'record_number': record_number,
+            'field': field,
+            'reason': reason,
+            'record': dict(zip(self.columns, self._values(record))),
+        }
@@ -3,11 +3,29 @@
 Robust CSV Import - Handles connection timeouts and large datasets
 """
 
+import argparse
 import csv
+import functools
+import hashlib
+import itertools
+import json
+import queue
+import random
+import re
 import sys
 import os
+import threading
 import time
-from typing import Dict
+from array import array
+from collections import deque
+from bisect import bisect_left, bisect_right
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from operator import itemgetter
+from struct import error as struct_error
+from dataclasses import asdict, dataclass, field
+from typing import (BinaryIO, Callable, Dict, Iterable, Iterator, List,
+                    Optional, Tuple, Union)
 
 try:
     import pyodbc
@@ -23,49 +41,875 @@ except ImportError:
     print("   pip install python-dotenv")
     sys.exit(1)
 
-# Load environment variables from .env file
-print("🔍 Loading environment variables...")
+from column_cache import (GROUP_ROWS, ColumnCache, ColumnCacheWriter,
+                          cache_file_path, file_digest, remove_stale_caches)
+from csv_sources import (is_compressed, open_csv_binary, resolve_csv_path,
+                         uncompressed_size)
+from dead_letters import WHOLE_RECORD, DeadLetterFile
+from load_control import AdaptiveController
+from load_metrics import LoadMetrics, estimate_remaining, format_duration
+
 script_dir = os.path.dirname(os.path.abspath(__file__))
-env_file = os.path.join(script_dir, '.env')
-print(f"📁 Looking for .env file at: {env_file}")
-
-if os.path.exists(env_file):
-    print("✅ .env file found")
-    load_dotenv(env_file)
-else:
-    print("⚠️  .env file not found, looking in current directory")
-    load_dotenv()
-
-# Database connection parameters from environment variables
-CONNECTION_PARAMS = {
-    'server': os.getenv('DB_SERVER'),
-    'database': os.getenv('DB_DATABASE', 'SystemDemoDB'),
-    'username': os.getenv('DB_USERNAME'),
-    'password': os.getenv('DB_PASSWORD'),
-    'driver': os.getenv('DB_DRIVER', '{ODBC Driver 18 for SQL Server}'),
-    'port': int(os.getenv('DB_PORT', 1433))
-}
-
-# Validate required environment variables
-required_vars = ['DB_SERVER', 'DB_USERNAME', 'DB_PASSWORD']
-missing_vars = [var for var in required_vars if not os.getenv(var)]
-
-if missing_vars:
-    print("❌ Missing required environment variables:")
-    for var in missing_vars:
-        print(f"   - {var}")
-    print("\n📝 Please create a .env file with the required variables.")
-    print("   See .env.example for the template.")
-    sys.exit(1)
 
-# Debug: Print loaded configuration (masking password)
-print("🔧 Database Configuration:")
-print(f"   Server: {CONNECTION_PARAMS['server']}")
-print(f"   Database: {CONNECTION_PARAMS['database']}")
-print(f"   Username: {CONNECTION_PARAMS['username']}")
-print(f"   Password: {'*' * len(CONNECTION_PARAMS['password']) if CONNECTION_PARAMS['password'] else 'None'}")
-print(f"   Port: {CONNECTION_PARAMS['port']}")
-print()
+# Database connection parameters, filled in from environment variables by
+# load_configuration() when the script runs rather than when it is imported
+CONNECTION_PARAMS = {}
+REQUIRED_VARS = ['DB_SERVER', 'DB_USERNAME', 'DB_PASSWORD']
+
+DEFAULT_CHECKPOINT_FILE = os.path.join(
+    script_dir, '.import-support-tickets.checkpoint.json')
+DEFAULT_FINGERPRINT_FILE = os.path.join(
+    script_dir, '.import-support-tickets.fingerprints.json')
+DEFAULT_DEAD_LETTER_FILE = os.path.join(
+    script_dir, '.import-support-tickets.dead-letter.csv')
+DEFAULT_CACHE_DIR = os.path.join(script_dir, '.csv-cache')
+
+# Connection handling: idle pooled connections are only re-validated after
+# this long, and transient failures back off exponentially with full jitter
+VALIDATE_AFTER_IDLE_SECONDS = 30
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30
+# Row mode commits (and on reconnect replays) groups of this many rows at
+# first; the adaptive controller grows the groups up to the maximum
+ROW_COMMIT_INTERVAL = 50
+MAX_ROW_COMMIT_INTERVAL = 1000
+# Batch and staging chunks grow from --chunk-size up to --max-chunk-size
+# while each one commits within --target-latency
+DEFAULT_MAX_CHUNK_SIZE = 20000
+DEFAULT_TARGET_LATENCY_SECONDS = 2.0
+# Chunks buffered between pipeline stages; bounds memory at roughly
+# (2 * PIPELINE_DEPTH + workers) chunks whatever the file size
+PIPELINE_DEPTH = 2
+# --parse-workers splits the CSV into shards of about this many bytes, each
+# parsed and converted in its own process; the boundary scan reads this much
+# at a time
+PARSE_SHARD_BYTES = 8 * 1024 * 1024
+SCAN_BLOCK_BYTES = 1024 * 1024
+
+# Per-stage timings for this run: read, convert, send, merge, commit, connect
+METRICS = LoadMetrics('import_support_tickets')
+
+# ODBC SQLSTATEs and SQL Server / Azure SQL error numbers worth retrying:
+# dropped links, timeouts, deadlocks, failovers and resource throttling
+TRANSIENT_SQLSTATES = {'08S01', '08001', '08003', '08004', '08007',
+                       '40001', 'HYT00', 'HYT01'}
+TRANSIENT_ERROR_NUMBERS = {64, 233, 1205, 4060, 4221, 10053, 10054, 10060,
+                           10928, 10929, 40143, 40197, 40501, 40613,
+                           49918, 49919, 49920}
+# Subsets of the above that name why the adaptive controller backs off
+DEADLOCK_SQLSTATES = {'40001'}
+TIMEOUT_SQLSTATES = {'HYT00', 'HYT01'}
+THROTTLING_ERROR_NUMBERS = {10928, 10929, 40501, 49918, 49919, 49920}
+# SQL Server names the offending column in truncation and conversion errors
+ERROR_COLUMN_PATTERN = re.compile(r"column '([^']+)'")
+
+
+def _blank_to_none(value: str) -> Optional[str]:
+    """Empty or whitespace-only text becomes NULL (customer_sentiment)"""
+    return value.strip() or None
+
+
+# support_tickets columns in CSV/table order: name, SQL Server type and the
+# function that converts the CSV text into the bound parameter value
+SUPPORT_TICKET_COLUMNS = [
+    ('ticket_id', 'BIGINT', int),
+    ('day_of_week', 'NVARCHAR(10)', str),
+    ('day_of_week_num', 'INT', int),
+    ('company_id', 'INT', int),
+    ('company_size', 'NVARCHAR(20)', str),
+    ('company_size_cat', 'INT', int),
+    ('industry', 'NVARCHAR(50)', str),
+    ('industry_cat', 'INT', int),
+    ('customer_tier', 'NVARCHAR(20)', str),
+    ('customer_tier_cat', 'INT', int),
+    ('org_users', 'INT', int),
+    ('region', 'NVARCHAR(10)', str),
+    ('region_cat', 'INT', int),
+    ('past_30d_tickets', 'INT', int),
+    ('past_90d_incidents', 'INT', int),
+    ('product_area', 'NVARCHAR(50)', str),
+    ('product_area_cat', 'INT', int),
+    ('booking_channel', 'NVARCHAR(20)', str),
+    ('booking_channel_cat', 'INT', int),
+    ('reported_by_role', 'NVARCHAR(50)', str),
+    ('reported_by_role_cat', 'INT', int),
+    ('customers_affected', 'INT', int),
+    ('error_rate_pct', 'DECIMAL(15,9)', float),
+    ('downtime_min', 'INT', int),
+    ('payment_impact_flag', 'BIT', int),
+    ('security_incident_flag', 'BIT', int),
+    ('data_loss_flag', 'BIT', int),
+    ('has_runbook', 'BIT', int),
+    ('customer_sentiment', 'NVARCHAR(20)', _blank_to_none),
+    ('customer_sentiment_cat', 'INT', int),
+    ('description_length', 'INT', int),
+    ('priority', 'NVARCHAR(20)', str),
+    ('priority_cat', 'INT', int),
+]
+COLUMN_NAMES = [name for name, _, _ in SUPPORT_TICKET_COLUMNS]
+COLUMN_LIST = ', '.join(COLUMN_NAMES)
+
+# --cache stores every converted column, plus where each record ends in the
+# file so checkpoints stay byte offsets. The schema string changes with the
+# column spec, which invalidates caches written for an older one.
+CACHE_KINDS = {int: 'int', float: 'float'}
+TICKET_CACHE_COLUMNS = [(name, CACHE_KINDS.get(convert, 'text'))
+                        for name, _, convert in SUPPORT_TICKET_COLUMNS]
+TICKET_CACHE_COLUMNS.append(('end_offset', 'int'))
+TICKET_CACHE_SCHEMA = 'support_tickets:' + ','.join(
+    f"{name} {sql_type} {convert.__name__}"
+    for name, sql_type, convert in SUPPORT_TICKET_COLUMNS)
+# Stands in for the values of a record that failed conversion
+CACHE_PLACEHOLDER_ROW = tuple({'int': 0, 'float': 0.0}.get(kind)
+                              for _, kind in TICKET_CACHE_COLUMNS[:-1])
+
+# Row mode: one MERGE round trip per ticket, skipping existing ticket_ids
+MERGE_ROW_SQL = """
+MERGE support_tickets AS target
+USING (VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+              ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)) AS source
+(ticket_id, day_of_week, day_of_week_num, company_id, company_size,
+ company_size_cat, industry, industry_cat, customer_tier,
+ customer_tier_cat, org_users, region, region_cat, past_30d_tickets,
+ past_90d_incidents, product_area, product_area_cat, booking_channel,
+ booking_channel_cat, reported_by_role, reported_by_role_cat,
+ customers_affected, error_rate_pct, downtime_min, payment_impact_flag,
+ security_incident_flag, data_loss_flag, has_runbook,
+ customer_sentiment, customer_sentiment_cat, description_length,
+ priority, priority_cat)
+ON target.ticket_id = source.ticket_id
+WHEN NOT MATCHED THEN
+    INSERT (ticket_id, day_of_week, day_of_week_num, company_id, company_size,
+           company_size_cat, industry, industry_cat, customer_tier,
+           customer_tier_cat, org_users, region, region_cat, past_30d_tickets,
+           past_90d_incidents, product_area, product_area_cat, booking_channel,
+           booking_channel_cat, reported_by_role, reported_by_role_cat,
+           customers_affected, error_rate_pct, downtime_min, payment_impact_flag,
+           security_incident_flag, data_loss_flag, has_runbook,
+           customer_sentiment, customer_sentiment_cat, description_length,
+           priority, priority_cat)
+    VALUES (source.ticket_id, source.day_of_week, source.day_of_week_num, 
+           source.company_id, source.company_size, source.company_size_cat, 
+           source.industry, source.industry_cat, source.customer_tier,
+           source.customer_tier_cat, source.org_users, source.region, 
+           source.region_cat, source.past_30d_tickets, source.past_90d_incidents, 
+           source.product_area, source.product_area_cat, source.booking_channel,
+           source.booking_channel_cat, source.reported_by_role, 
+           source.reported_by_role_cat, source.customers_affected, 
+           source.error_rate_pct, source.downtime_min, source.payment_impact_flag,
+           source.security_incident_flag, source.data_loss_flag, 
+           source.has_runbook, source.customer_sentiment, 
+           source.customer_sentiment_cat, source.description_length,
+           source.priority, source.priority_cat);
+"""
+
+# Batch mode: rows are array-bound into a session temp table with
+# fast_executemany, then merged in one set-based statement
+BATCH_TABLE = '#support_tickets_batch'
+CREATE_BATCH_TABLE_SQL = (
+    f"IF OBJECT_ID('tempdb..{BATCH_TABLE}') IS NULL "
+    f"CREATE TABLE {BATCH_TABLE} ("
+    + ', '.join(f"{name} {sql_type} NULL"
+                for name, sql_type, _ in SUPPORT_TICKET_COLUMNS)
+    + ")"
+)
+INSERT_BATCH_SQL = (
+    f"INSERT INTO {BATCH_TABLE} ({COLUMN_LIST}) "
+    f"VALUES ({', '.join('?' for _ in COLUMN_NAMES)})"
+)
+MERGE_BATCH_SQL = f"""
+SET NOCOUNT ON;
+DECLARE @inserted INT;
+MERGE support_tickets AS target
+USING {BATCH_TABLE} AS source
+ON target.ticket_id = source.ticket_id
+WHEN NOT MATCHED THEN
+    INSERT ({COLUMN_LIST})
+    VALUES ({', '.join(f'source.{name}' for name in COLUMN_NAMES)});
+SET @inserted = @@ROWCOUNT;
+TRUNCATE TABLE {BATCH_TABLE};
+SELECT @inserted;
+"""
+
+# Delta mode: matched rows are updated in place, but only when some column
+# differs. EXISTS (SELECT source... EXCEPT SELECT target...) compares the
+# columns NULL-safely without spelling out a predicate per column.
+CHANGED_COLUMNS = COLUMN_NAMES[1:]
+ROW_CHANGED_SQL = (
+    f"EXISTS (SELECT {', '.join(f'source.{name}' for name in CHANGED_COLUMNS)}"
+    f" EXCEPT SELECT {', '.join(f'target.{name}' for name in CHANGED_COLUMNS)})"
+)
+UPDATE_CHANGED_SQL = ', '.join(f"{name} = source.{name}"
+                               for name in CHANGED_COLUMNS)
+MERGE_ROW_DELTA_SQL = f"""
+MERGE support_tickets AS target
+USING (VALUES ({', '.join('?' for _ in COLUMN_NAMES)})) AS source
+({COLUMN_LIST})
+ON target.ticket_id = source.ticket_id
+WHEN MATCHED AND {ROW_CHANGED_SQL} THEN
+    UPDATE SET {UPDATE_CHANGED_SQL}
+WHEN NOT MATCHED THEN
+    INSERT ({COLUMN_LIST})
+    VALUES ({', '.join(f'source.{name}' for name in COLUMN_NAMES)});
+"""
+MERGE_BATCH_DELTA_SQL = f"""
+SET NOCOUNT ON;
+DECLARE @changed INT;
+MERGE support_tickets AS target
+USING {BATCH_TABLE} AS source
+ON target.ticket_id = source.ticket_id
+WHEN MATCHED AND {ROW_CHANGED_SQL} THEN
+    UPDATE SET {UPDATE_CHANGED_SQL}
+WHEN NOT MATCHED THEN
+    INSERT ({COLUMN_LIST})
+    VALUES ({', '.join(f'source.{name}' for name in COLUMN_NAMES)});
+SET @changed = @@ROWCOUNT;
+TRUNCATE TABLE {BATCH_TABLE};
+SELECT @changed;
+"""
+
+# Staging mode: the whole file is bulk-inserted into an index-free heap, then
+# moved into support_tickets with a single set-based INSERT ... NOT EXISTS
+STAGING_TABLE = 'support_tickets_staging'
+CREATE_STAGING_TABLE_SQL = (
+    f"IF OBJECT_ID('dbo.{STAGING_TABLE}') IS NULL "
+    f"CREATE TABLE dbo.{STAGING_TABLE} (staging_row BIGINT IDENTITY(1,1), "
+    + ', '.join(f"{name} {sql_type} NULL"
+                for name, sql_type, _ in SUPPORT_TICKET_COLUMNS)
+    + ")"
+)
+TRUNCATE_STAGING_TABLE_SQL = f"TRUNCATE TABLE dbo.{STAGING_TABLE}"
+DROP_STAGING_TABLE_SQL = f"DROP TABLE IF EXISTS dbo.{STAGING_TABLE}"
+INSERT_STAGING_SQL = (
+    f"INSERT INTO dbo.{STAGING_TABLE} ({COLUMN_LIST}) "
+    f"VALUES ({', '.join('?' for _ in COLUMN_NAMES)})"
+)
+# First occurrence of each ticket_id wins, as it would with per-row MERGE
+MERGE_STAGING_SQL = f"""
+SET NOCOUNT ON;
+DECLARE @inserted INT;
+INSERT INTO support_tickets WITH (TABLOCK) ({COLUMN_LIST})
+SELECT {COLUMN_LIST}
+FROM (
+    SELECT *, ROW_NUMBER() OVER (
+        PARTITION BY ticket_id ORDER BY staging_row) AS occurrence
+    FROM dbo.{STAGING_TABLE}
+) AS source
+WHERE source.occurrence = 1
+  AND NOT EXISTS (
+      SELECT 1 FROM support_tickets AS target
+      WHERE target.ticket_id = source.ticket_id);
+SET @inserted = @@ROWCOUNT;
+SELECT @inserted;
+"""
+
+# Nonclustered indexes from create-support-tickets-table.sql; the clustered
+# primary key must stay enabled or the table becomes unreadable
+SUPPORT_TICKET_INDEXES = [
+    'IX_support_tickets_company_id',
+    'IX_support_tickets_priority',
+    'IX_support_tickets_customer_tier',
+    'IX_support_tickets_product_area',
+    'IX_support_tickets_region',
+    'IX_support_tickets_day_of_week',
+]
+ALTER_INDEX_SQL = """
+IF EXISTS (SELECT 1 FROM sys.indexes
+           WHERE name = '{index_name}'
+             AND object_id = OBJECT_ID('support_tickets'))
+    ALTER INDEX {index_name} ON support_tickets {action};
+"""
+DISABLED_INDEXES_SQL = """
+SELECT name FROM sys.indexes
+WHERE object_id = OBJECT_ID('support_tickets') AND is_disabled = 1
+"""
+
+
+class OffsetLineReader:
+    """Yield decoded lines from a binary file while tracking the byte offset.
+
+    ``csv.reader`` pulls exactly one line at a time from its source, so after
+    each parsed record ``offset`` is the byte position of the next record,
+    even when a quoted field spans several lines.
+    """
+
+    def __init__(self, raw_file: BinaryIO, encoding: str = 'utf-8'):
+        self.raw_file = raw_file
+        self.encoding = encoding
+        self.offset = raw_file.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.raw_file.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode(self.encoding)
+
+    def seek(self, offset: int) -> None:
+        """Jump to a record boundary previously reported by ``offset``"""
+        self.raw_file.seek(offset)
+        self.offset = offset
+
+
+@dataclass
+class CsvChunk:
+    """A run of consecutive CSV records and the byte range they came from"""
+    start_row: int
+    start_offset: int
+    end_offset: int
+    rows: List[List[str]]
+
+
+@dataclass
+class ConvertedChunk:
+    """A chunk's typed rows, ready to send, plus its position in the file"""
+    start_row: int
+    start_offset: int
+    end_offset: int
+    row_count: int
+    last_ticket_id: Optional[int]
+    rows: List[Tuple]
+    failed_rows: int = 0
+    known_rows: int = 0
+    duplicate_rows: int = 0
+    # Conversion failures, then rows the database refused
+    errors: List['FieldError'] = field(default_factory=list)
+    # Delta mode: fingerprint of every row in ``rows``, by ticket_id
+    fingerprints: Dict[int, str] = field(default_factory=dict)
+    # Row number of each entry in ``rows``, and the chunk's raw records,
+    # so rejected rows can be dead-lettered exactly as they were read
+    row_numbers: List[int] = field(default_factory=list)
+    source_records: List[List[str]] = field(default_factory=list)
+    # Set instead of source_records by chunks parsed in another process;
+    # the records are re-read from the file only if one is dead-lettered
+    source_path: Optional[str] = None
+
+    def reject(self, index: int, error: Exception) -> None:
+        """Record that the database refused ``rows[index]`` on its own"""
+        # pyodbc errors carry (sqlstate, message); the message is enough
+        message = str(error.args[-1]) if error.args else str(error)
+        column = ERROR_COLUMN_PATTERN.search(message)
+        self.errors.append(FieldError(
+            self.row_numbers[index], column.group(1) if column else WHOLE_RECORD,
+            None, message))
+        self.failed_rows += 1
+        # Never fingerprint a row that did not load; the next delta run
+        # must send it again
+        self.fingerprints.pop(self.rows[index][0], None)
+
+    def source_record(self, row_number: int) -> List[str]:
+        if not self.source_records and self.source_path is not None:
+            self.source_records = next(parse_byte_range(
+                self.source_path, self.start_offset, self.end_offset,
+                self.row_count)).rows
+        return self.source_records[row_number - self.start_row]
+
+    def renumber(self, start_row: int) -> None:
+        """Move row numbers counted from the start of a shard onto the file"""
+        shift = start_row - self.start_row
+        self.start_row = start_row
+        self.row_numbers = [row_number + shift
+                            for row_number in self.row_numbers]
+        for error in self.errors:
+            error.row_number += shift
+
+
+@dataclass
+class ParsedShard:
+    """The converted chunks of one byte range, parsed in a worker process"""
+    start_offset: int
+    end_offset: int
+    # Where parsing actually stopped: the end of the last record that
+    # started inside the range
+    parsed_end: int
+    chunks: List[ConvertedChunk] = field(default_factory=list)
+    read_seconds: float = 0.0
+    convert_seconds: float = 0.0
+
+    @property
+    def row_count(self) -> int:
+        return sum(chunk.row_count for chunk in self.chunks)
+
+
+@dataclass
+class FieldError:
+    """Why one field of one CSV record could not be converted"""
+    row_number: int
+    column: str
+    value: Optional[str]
+    reason: str
+
+    def __str__(self) -> str:
+        return (f"row {self.row_number}, column {self.column}: "
+                f"{self.reason} (value {self.value!r})")
+
+
+class RowConverter:
+    """Converts raw ``csv.reader`` records into support_tickets tuples
+
+    Column positions are resolved once from the header, so converting a
+    record is a single pass over a precompiled list of (position,
+    converter) pairs with no per-row dict building or key lookups.
+    """
+
+    def __init__(self, header: List[str]):
+        positions = {name.strip(): index for index, name in enumerate(header)}
+        missing = [name for name in COLUMN_NAMES if name not in positions]
+        if missing:
+            raise ValueError(
+                f"CSV header is missing columns: {', '.join(missing)}")
+        self.plan = [(positions[name], name, convert)
+                     for name, _, convert in SUPPORT_TICKET_COLUMNS]
+        self.header = header
+        self.ticket_id_index = positions['ticket_id']
+        self.record_width = len(header)
+        self._fields = itemgetter(*(index for index, _, _ in self.plan))
+        self._converters = [convert for _, _, convert in self.plan]
+
+    def convert(self, record: List[str]) -> Tuple:
+        """Convert one record; raises on the first bad field"""
+        return tuple([convert(value) for convert, value
+                      in zip(self._converters, self._fields(record))])
+
+    def field_errors(self, record: List[str],
+                     row_number: int) -> List[FieldError]:
+        """Re-check a record that failed convert() field by field"""
+        if len(record) < self.record_width:
+            return [FieldError(row_number, '*', None,
+                               f"record has {len(record)} fields, header "
+                               f"has {self.record_width}")]
+        errors = []
+        for index, name, convert in self.plan:
+            try:
+                convert(record[index])
+            except (ValueError, TypeError) as e:
+                errors.append(FieldError(row_number, name, record[index],
+                                         str(e)))
+        return errors
+
+    def convert_batch(self, numbered_records: Iterable[Tuple[int, List[str]]]
+                      ) -> Tuple[List[Tuple], List[int], List[FieldError]]:
+        """Convert (row number, record) pairs, returning the converted rows,
+        their row numbers and structured errors for the records that fail"""
+        converted_rows = []
+        row_numbers = []
+        errors = []
+        convert = self.convert
+        for row_number, record in numbered_records:
+            try:
+                converted_rows.append(convert(record))
+            except (ValueError, TypeError, IndexError):
+                errors.extend(self.field_errors(record, row_number))
+                continue
+            row_numbers.append(row_number)
+        return converted_rows, row_numbers, errors
+
+
+class PipelineStage(threading.Thread):
+    """Thread that maps items from an upstream iterator onto a bounded queue
+
+    Iterating the stage yields its output in order. A full queue blocks the
+    stage (backpressure), an exception is re-raised in the consumer, and
+    setting ``stop_event`` unblocks and ends every stage sharing it.
+    """
+
+    _END_OF_STREAM = object()
+
+    def __init__(self, name: str, items, transform,
+                 stop_event: threading.Event, depth: int = PIPELINE_DEPTH):
+        super().__init__(name=name, daemon=True)
+        self.items = items
+        self.transform = transform
+        self.stop_event = stop_event
+        self.output = queue.Queue(maxsize=depth)
+
+    def run(self) -> None:
+        try:
+            for item in self.items:
+                if not self._put(self.transform(item)):
+                    return
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(self._END_OF_STREAM)
+
+    def __iter__(self):
+        while not self.stop_event.is_set():
+            try:
+                item = self.output.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is self._END_OF_STREAM:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _put(self, item) -> bool:
+        while not self.stop_event.is_set():
+            try:
+                self.output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+@dataclass
+class ImportCheckpoint:
+    """Position of the last committed chunk, persisted between runs"""
+    csv_file: str
+    file_size: int
+    file_mtime: float
+    mode: str
+    byte_offset: int
+    next_row: int
+    last_ticket_id: Optional[int]
+    records_loaded: int
+
+    def matches_file(self, csv_file_path: str) -> bool:
+        """True when the checkpoint was written for this exact file"""
+        stat = os.stat(csv_file_path)
+        return (os.path.abspath(csv_file_path) == self.csv_file
+                and stat.st_size == self.file_size
+                and stat.st_mtime == self.file_mtime)
+
+
+class ExistingTicketIndex:
+    """Compact sorted set of the ticket_ids already in support_tickets
+
+    Ids are held in an ``array('q')`` (8 bytes each, ~400 KB for 50k rows)
+    and looked up by binary search, so known rows can be dropped client-side
+    before they cost a round trip.
+    """
+
+    def __init__(self, ticket_ids: array):
+        self.ticket_ids = ticket_ids
+
+    def __len__(self) -> int:
+        return len(self.ticket_ids)
+
+    def __contains__(self, ticket_id: int) -> bool:
+        position = bisect_left(self.ticket_ids, ticket_id)
+        return (position < len(self.ticket_ids)
+                and self.ticket_ids[position] == ticket_id)
+
+    def contains_raw(self, ticket_id: str) -> bool:
+        """True when a ticket_id straight from the CSV is already loaded"""
+        try:
+            return int(ticket_id) in self
+        except ValueError:
+            # Let the normal conversion path report malformed ids
+            return False
+
+    @classmethod
+    def load(cls, conn, fetch_size: int = 50000) -> 'ExistingTicketIndex':
+        """Stream every existing ticket_id in clustered-key order"""
+        ticket_ids = array('q')
+        cursor = conn.cursor()
+        cursor.execute("SELECT ticket_id FROM support_tickets ORDER BY ticket_id")
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            ticket_ids.extend(row[0] for row in rows)
+        cursor.close()
+        return cls(ticket_ids)
+
+
+class TicketFingerprints:
+    """Content hash of every ticket last written to one database
+
+    Delta mode drops rows whose converted values hash the same as last time,
+    so a refresh only sends new and changed tickets. Hashes are recorded
+    only for committed chunks; the file is tied to the server and database
+    it describes, and deleting it simply makes the next run compare every
+    row server-side instead.
+    """
+
+    def __init__(self, path: str, target: str,
+                 hashes: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.target = target
+        self.hashes = hashes or {}
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @staticmethod
+    def fingerprint(row_data: Tuple) -> str:
+        """Hash a converted row; repr() of its str/int/float/None values is stable"""
+        return hashlib.blake2b(repr(row_data).encode('utf-8'),
+                               digest_size=16).hexdigest()
+
+    def is_unchanged(self, row_data: Tuple, fingerprint: str) -> bool:
+        return self.hashes.get(str(row_data[0])) == fingerprint
+
+    def record(self, fingerprints: Dict[int, str]) -> None:
+        """Remember the rows of a committed chunk"""
+        for ticket_id, fingerprint in fingerprints.items():
+            self.hashes[str(ticket_id)] = fingerprint
+
+    @classmethod
+    def load(cls, path: str, target: str) -> 'TicketFingerprints':
+        """Load the fingerprints recorded for ``target``, if any"""
+        if not os.path.exists(path):
+            return cls(path, target)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable fingerprint file {path}: {e}")
+            return cls(path, target)
+        if data.get('target') != target:
+            print(f"⚠️  Fingerprints in {path} describe another database; "
+                  f"comparing every row")
+            return cls(path, target)
+        return cls(path, target, data.get('tickets', {}))
+
+    def save(self) -> None:
+        """Atomically replace the fingerprint file"""
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump({'target': self.target, 'tickets': self.hashes}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file, self.path)
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived pyodbc connections shared by loader threads
+
+    At most ``size`` connections are leased at once. Idle connections are
+    reused most-recent-first and only re-validated with ``SELECT 1`` when
+    they have sat idle for ``VALIDATE_AFTER_IDLE_SECONDS``. Connections are
+    replaced only after a real failure, never on a schedule.
+
+    Every operation's duration and transient failure is reported to
+    ``controller``, which sizes the work the loaders hand to the pool.
+    """
+
+    def __init__(self, size: int,
+                 controller: Optional[AdaptiveController] = None):
+        self.size = size
+        self.controller = controller
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        """Lease a healthy connection, blocking while all are in use"""
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    conn, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    return get_connection()
+                idle_for = time.monotonic() - idle_since
+                if idle_for < VALIDATE_AFTER_IDLE_SECONDS or self._is_healthy(conn):
+                    return conn
+                self._close_quietly(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, discard: bool = False) -> None:
+        """Return a leased connection; ``discard`` closes it instead"""
+        if discard:
+            self._close_quietly(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._slots.release()
+
+    def run(self, operation, description: str = "database operation"):
+        """Run ``operation(conn)`` on a leased connection, replaying it on
+        a fresh connection after transient failures
+
+        ``operation`` must commit its own work. Anything it had not
+        committed when the connection broke is rolled back by the server, so
+        replaying the whole operation neither loses nor duplicates rows.
+        A statement the database refuses (a bad value, a constraint) leaves
+        the session usable, so its connection is rolled back and reused.
+        """
+        for attempt in range(MAX_ATTEMPTS):
+            conn = self.acquire()
+            started = time.perf_counter()
+            try:
+                result = operation(conn)
+            except pyodbc.Error as e:
+                transient = is_transient_error(e)
+                self.release(conn, discard=transient
+                             or not self._rolled_back(conn))
+                if not transient or attempt == MAX_ATTEMPTS - 1:
+                    raise
+                delay = backoff_delay(attempt)
+                METRICS.increment('retries')
+                reason = overload_reason(e)
+                if self.controller is not None and reason:
+                    self.controller.back_off(reason)
+                print(f"⚠️  Transient error during {description}, replaying "
+                      f"in {delay:.1f}s (attempt {attempt + 2}/"
+                      f"{MAX_ATTEMPTS}): {e}")
+                time.sleep(delay)
+                continue
+            except Exception:
+                self.release(conn, discard=True)
+                raise
+            self.release(conn)
+            if self.controller is not None:
+                self.controller.record(time.perf_counter() - started)
+            return result
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1").fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    @staticmethod
+    def _rolled_back(conn) -> bool:
+        """Roll back a failed operation; False if the connection is broken"""
+        try:
+            conn.rollback()
+            return True
+        except pyodbc.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+
+@dataclass
+class WorkerStats:
+    """Per-thread accounting for parallel loads"""
+    chunks_loaded: int = 0
+    chunks_failed: int = 0
+    records_imported: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class ImportProgress:
+    """Running totals for committed chunks, checkpointed as they land"""
+
+    def __init__(self, csv_file_path: str, mode: str, checkpoint_file: str,
+                 records_loaded: int = 0,
+                 fingerprints: Optional[TicketFingerprints] = None,
+                 start_offset: int = 0,
+                 dead_letters: Optional[DeadLetterFile] = None):
+        self.csv_file_path = csv_file_path
+        self.mode = mode
+        self.checkpoint_file = checkpoint_file
+        self.records_loaded = records_loaded
+        self.fingerprints = fingerprints
+        self.dead_letters = dead_letters
+        self.rows_processed = 0
+        self.chunks_committed = 0
+        self.started_at = time.monotonic()
+        # The ETA extrapolates bytes committed this run over the bytes left
+        self.start_offset = start_offset
+        self.bytes_done = start_offset
+        try:
+            self.total_bytes = uncompressed_size(csv_file_path)
+        except (OSError, ValueError, struct_error):
+            self.total_bytes = None
+
+    def add(self, chunk: 'ConvertedChunk', imported: int) -> None:
+        """Count a chunk whose rows are committed"""
+        self.records_loaded += imported
+        if self.fingerprints is not None:
+            self.fingerprints.record(chunk.fingerprints)
+        self.rows_processed += chunk.row_count
+        self.chunks_committed += 1
+        self.bytes_done = max(self.bytes_done, chunk.end_offset)
+
+    def checkpoint(self, chunk: 'ConvertedChunk') -> None:
+        """Record that everything up to the end of ``chunk`` is committed
+
+        The chunk's dead letters are written here rather than when it
+        commits. A resumed run re-sends every chunk past the checkpoint,
+        so rows rejected there are rejected, and written, again.
+        """
+        if self.dead_letters is not None and chunk.errors:
+            write_dead_letters(chunk, self.dead_letters)
+        save_checkpoint(self.checkpoint_file, checkpoint_after(
+            chunk, self.csv_file_path, self.mode, self.records_loaded))
+
+    def report(self) -> None:
+        """Print aggregated progress across all workers"""
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        total = self.total_bytes and self.total_bytes - self.start_offset
+        remaining = estimate_remaining(self.bytes_done - self.start_offset,
+                                       total, elapsed)
+        print(f"📈 Progress: {self.chunks_committed:,} chunks, "
+              f"{self.rows_processed:,} rows processed, "
+              f"{self.records_loaded:,} loaded "
+              f"({self.rows_processed / elapsed:,.0f} rows/sec, "
+              f"ETA {format_duration(remaining)})")
+
+
+def load_configuration() -> bool:
+    """Load .env and the connection parameters; False if any are missing"""
+    # Load environment variables from .env file
+    print("🔍 Loading environment variables...")
+    env_file = os.path.join(script_dir, '.env')
+    print(f"📁 Looking for .env file at: {env_file}")
+
+    if os.path.exists(env_file):
+        print("✅ .env file found")
+        load_dotenv(env_file)
+    else:
+        print("⚠️  .env file not found, looking in current directory")
+        load_dotenv()
+
+    # Validate required environment variables
+    missing_vars = [var for var in REQUIRED_VARS if not os.getenv(var)]
+    if missing_vars:
+        print("❌ Missing required environment variables:")
+        for var in missing_vars:
+            print(f"   - {var}")
+        print("\n📝 Please create a .env file with the required variables.")
+        print("   See .env.example for the template.")
+        return False
+
+    CONNECTION_PARAMS.update({
+        'server': os.getenv('DB_SERVER'),
+        'database': os.getenv('DB_DATABASE', 'SystemDemoDB'),
+        'username': os.getenv('DB_USERNAME'),
+        'password': os.getenv('DB_PASSWORD'),
+        'driver': os.getenv('DB_DRIVER', '{ODBC Driver 18 for SQL Server}'),
+        'port': int(os.getenv('DB_PORT', 1433))
+    })
+
+    # Debug: Print loaded configuration (masking password)
+    print("🔧 Database Configuration:")
+    print(f"   Server: {CONNECTION_PARAMS['server']}")
+    print(f"   Database: {CONNECTION_PARAMS['database']}")
+    print(f"   Username: {CONNECTION_PARAMS['username']}")
+    print(f"   Password: {'*' * len(CONNECTION_PARAMS['password'])}")
+    print(f"   Port: {CONNECTION_PARAMS['port']}")
+    print()
+    return True
 
 
 def create_connection_string(params: Dict[str, str]) -> str:
@@ -82,249 +926,1436 @@ def create_connection_string(params: Dict[str, str]) -> str:
     )
 
 
+def is_transient_error(error: Exception) -> bool:
+    """True for connection drops, timeouts, deadlocks and throttling"""
+    if not isinstance(error, pyodbc.Error):
+        return False
+    sqlstate = error.args[0] if error.args else ''
+    if sqlstate in TRANSIENT_SQLSTATES:
+        return True
+    message = str(error)
+    return any(f"({number})" in message for number in TRANSIENT_ERROR_NUMBERS)
+
+
+def overload_reason(error: Exception) -> Optional[str]:
+    """Why a transient failure points at an overloaded server, or None
+
+    Dropped connections are replayed like any transient failure but say
+    nothing about load, so they do not shrink chunk size or workers.
+    """
+    sqlstate = error.args[0] if error.args else ''
+    message = str(error)
+    if sqlstate in DEADLOCK_SQLSTATES or "(1205)" in message:
+        return "deadlock"
+    if sqlstate in TIMEOUT_SQLSTATES:
+        return "timeout"
+    if any(f"({number})" in message for number in THROTTLING_ERROR_NUMBERS):
+        return "throttled"
+    return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given retry attempt"""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
 def get_connection():
-    """Get a fresh database connection with retry logic"""
+    """Open a database connection, retrying transient failures with backoff"""
     conn_str = create_connection_string(CONNECTION_PARAMS)
-    max_retries = 3
-    for attempt in range(max_retries):
+    for attempt in range(MAX_ATTEMPTS):
         try:
-            conn = pyodbc.connect(conn_str)
+            with METRICS.time('connect'):
+                conn = pyodbc.connect(conn_str)
             conn.timeout = 30
             return conn
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"⚠️  Connection attempt {attempt + 1} failed, retrying...")
-                time.sleep(2)
-            else:
-                raise e
+        except pyodbc.Error as e:
+            if not is_transient_error(e) or attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = backoff_delay(attempt)
+            METRICS.increment('connect_retries')
+            print(f"⚠️  Connection attempt {attempt + 1} failed, retrying in "
+                  f"{delay:.1f}s...")
+            time.sleep(delay)
+
+
+def stream_csv_chunks(csv_file_path: str,
+                      chunk_size: Union[int, Callable[[], int]] = 1000,
+                      start_offset: Optional[int] = None,
+                      start_row: int = 1) -> Iterator[CsvChunk]:
+    """Read the CSV once, yielding chunks tagged with their byte ranges
+
+    Passing the ``end_offset`` of a previous chunk as ``start_offset`` seeks
+    straight to that record instead of re-parsing everything before it.
+    ``.zip`` and ``.gz`` inputs are decompressed as they stream; their
+    offsets refer to the decompressed CSV. A callable ``chunk_size`` is
+    asked again at the start of every chunk.
+    """
+    next_chunk_size = chunk_size if callable(chunk_size) else (
+        lambda: chunk_size)
+    with open_csv_binary(csv_file_path) as raw_file:
+        lines = OffsetLineReader(raw_file)
+        next(csv.reader(lines))  # header; see read_csv_header()
+        if start_offset is not None and start_offset > lines.offset:
+            lines.seek(start_offset)
+
+        reader = csv.reader(lines)
+        chunk_row = start_row
+        chunk_offset = lines.offset
+        rows = []
+        limit = next_chunk_size()
+        for record in reader:
+            rows.append(record)
+            if len(rows) >= limit:
+                yield CsvChunk(chunk_row, chunk_offset, lines.offset, rows)
+                chunk_row += len(rows)
+                chunk_offset = lines.offset
+                rows = []
+                limit = next_chunk_size()
+
+        if rows:
+            yield CsvChunk(chunk_row, chunk_offset, lines.offset, rows)
+
+
+def read_csv_header(csv_file_path: str) -> List[str]:
+    """Read just the header record of the tickets CSV"""
+    with open_csv_binary(csv_file_path) as raw_file:
+        return next(csv.reader(OffsetLineReader(raw_file)))
+
+
+def parse_byte_range(csv_file_path: str, start: int, end: int,
+                     chunk_size: int, start_row: int = 0
+                     ) -> Iterator[CsvChunk]:
+    """Parse the records of a CSV that start in [start, end)
+
+    ``start`` must be a record boundary. A record that starts before ``end``
+    is read to its end even when a quoted field carries it past ``end``.
+    Compressed input works too, but decompresses everything before
+    ``start``; only dead-letter lookups use it that way.
+    """
+    with open_csv_binary(csv_file_path) as raw_file:
+        raw_file.seek(start)
+        lines = OffsetLineReader(raw_file)
+        reader = csv.reader(lines)
+        chunk_row = start_row
+        chunk_offset = start
+        rows = []
+        while lines.offset < end:
+            record = next(reader, None)
+            if record is None:
+                break
+            rows.append(record)
+            if len(rows) >= chunk_size:
+                yield CsvChunk(chunk_row, chunk_offset, lines.offset, rows)
+                chunk_row += len(rows)
+                chunk_offset = lines.offset
+                rows = []
+
+        if rows:
+            yield CsvChunk(chunk_row, chunk_offset, lines.offset, rows)
+
+
+def plan_shards(csv_file_path: str, start: int,
+                shard_bytes: int = PARSE_SHARD_BYTES
+                ) -> Iterator[Tuple[int, int]]:
+    """Split an uncompressed CSV from ``start`` into record-aligned ranges
+
+    A newline ends a record only outside quotes, which is where the number
+    of ``"`` characters since ``start`` is even (an escaped ``""`` adds
+    two). Each shard ends at the first such newline after ``shard_bytes``.
+    Counting quotes is one ``bytes.count()`` per block, far cheaper than
+    parsing, and shards are yielded as soon as their end is found.
+    """
+    size = os.path.getsize(csv_file_path)
+    shard_start = start
+    target = start + shard_bytes
+    in_quotes = 0
+    with open(csv_file_path, 'rb') as file:
+        file.seek(start)
+        block_offset = start
+        while target < size:
+            block = file.read(SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            block_end = block_offset + len(block)
+            cursor = 0
+            while target < block_end:
+                position = max(target - block_offset, cursor)
+                in_quotes ^= block.count(b'"', cursor, position) & 1
+                cursor = position
+                newline = block.find(b'\n', cursor)
+                while newline != -1:
+                    in_quotes ^= block.count(b'"', cursor, newline) & 1
+                    cursor = newline + 1
+                    if not in_quotes:
+                        break
+                    newline = block.find(b'\n', cursor)
+                if newline == -1:
+                    # The boundary is in a later block
+                    break
+                yield shard_start, block_offset + cursor
+                shard_start = block_offset + cursor
+                target = shard_start + shard_bytes
+            in_quotes ^= block.count(b'"', cursor) & 1
+            block_offset = block_end
+    if shard_start < size:
+        yield shard_start, size
 
 
-def import_csv_chunk(csv_file_path: str, start_row: int = 1,
-                     chunk_size: int = 1000):  # Reduced chunk size
-    """Import a chunk of CSV data with better error handling"""
+def convert_chunk(chunk: CsvChunk, converter: RowConverter,
+                  known_ticket_ids: Optional[ExistingTicketIndex] = None,
+                  fingerprints: Optional[TicketFingerprints] = None
+                  ) -> ConvertedChunk:
+    """Convert every row of a chunk, setting aside the rows that fail
+
+    Rows already in ``known_ticket_ids`` are skipped before conversion, and
+    repeats of a ticket_id within the chunk keep only the first occurrence.
+    With ``fingerprints``, rows unchanged since the last delta run are
+    counted as known and dropped too.
+    """
+    ticket_id_index = converter.ticket_id_index
+    numbered_records = list(enumerate(chunk.rows, chunk.start_row))
+    if known_ticket_ids is not None:
+        numbered_records = [
+            (row_number, record) for row_number, record in numbered_records
+            if not known_ticket_ids.contains_raw(record[ticket_id_index])]
     
-    if not os.path.exists(csv_file_path):
-        print(f"❌ Error: CSV file not found at {csv_file_path}")
-        return False, 0, False
+    converted_rows, row_numbers, errors = converter.convert_batch(
+        numbered_records)
+    
+    converted = ConvertedChunk(
+        start_row=chunk.start_row,
+        start_offset=chunk.start_offset,
+        end_offset=chunk.end_offset,
+        row_count=len(chunk.rows),
+        last_ticket_id=None,
+        rows=[],
+        failed_rows=len(numbered_records) - len(converted_rows),
+        known_rows=len(chunk.rows) - len(numbered_records),
+        errors=errors,
+        source_records=chunk.rows,
+    )
+    add_converted_rows(converted, converted_rows, row_numbers, fingerprints)
+    
+    try:
+        converted.last_ticket_id = int(chunk.rows[-1][ticket_id_index])
+    except (IndexError, ValueError):
+        pass
+    return converted
+
+
+def add_converted_rows(converted: ConvertedChunk, converted_rows: List[Tuple],
+                       row_numbers: List[int],
+                       fingerprints: Optional[TicketFingerprints]) -> None:
+    """Add rows to a chunk, keeping the first of each ticket_id and, in
+    delta mode, only rows that changed since the last run"""
+    seen_ids = set()
+    for row_data, row_number in zip(converted_rows, row_numbers):
+        if row_data[0] in seen_ids:
+            converted.duplicate_rows += 1
+            continue
+        seen_ids.add(row_data[0])
+        if fingerprints is not None:
+            fingerprint = TicketFingerprints.fingerprint(row_data)
+            if fingerprints.is_unchanged(row_data, fingerprint):
+                converted.known_rows += 1
+                continue
+            converted.fingerprints[row_data[0]] = fingerprint
+        converted.rows.append(row_data)
+        converted.row_numbers.append(row_number)
+
+
+def build_ticket_cache(csv_file_path: str, converter: RowConverter,
+                       cache_path: str, digest: str) -> int:
+    """Parse and convert the whole CSV into a column cache; returns its rows
+
+    Records that fail conversion keep their place as placeholder values,
+    with their errors and raw ticket_id stored alongside the group.
+    """
+    total_rows = 0
+    with open_csv_binary(csv_file_path) as raw_file:
+        lines = OffsetLineReader(raw_file)
+        next(csv.reader(lines))  # header; see read_csv_header()
+        metadata = {'first_offset': lines.offset}
+        with ColumnCacheWriter(cache_path, TICKET_CACHE_COLUMNS, digest,
+                               TICKET_CACHE_SCHEMA, metadata) as writer:
+            reader = csv.reader(lines)
+            while True:
+                started = time.perf_counter()
+                records = []
+                end_offsets = []
+                for record in reader:
+                    records.append(record)
+                    end_offsets.append(lines.offset)
+                    if len(records) >= GROUP_ROWS:
+                        break
+                read_done = time.perf_counter()
+                METRICS.observe('read', read_done - started, len(records))
+                if not records:
+                    return total_rows
+                
+                converted_rows, indexes, errors = converter.convert_batch(
+                    enumerate(records))
+                group_rows = [CACHE_PLACEHOLDER_ROW] * len(records)
+                for row_data, index in zip(converted_rows, indexes):
+                    group_rows[index] = row_data
+                errors_by_index: Dict[int, List] = {}
+                for error in errors:
+                    errors_by_index.setdefault(error.row_number, []).append(
+                        [error.column, error.value, error.reason])
+                failed = []
+                for index, field_errors in errors_by_index.items():
+                    try:
+                        ticket_id = int(
+                            records[index][converter.ticket_id_index])
+                    except (IndexError, ValueError):
+                        ticket_id = None
+                    failed.append([index, ticket_id, field_errors])
+                writer.add_group([*zip(*group_rows), end_offsets], {
+                    'end_offset': end_offsets[-1],
+                    'failed': failed,
+                })
+                METRICS.observe('convert', time.perf_counter() - read_done,
+                                len(records))
+                total_rows += len(records)
+
+
+def open_ticket_cache(csv_file_path: str, converter: RowConverter,
+                      cache_dir: str) -> Optional[ColumnCache]:
+    """Open the column cache of this exact CSV, building it on a miss
+
+    Returns None if the cache cannot be built, and the import parses the
+    CSV as usual.
+    """
+    digest = file_digest(csv_file_path)
+    cache_path = cache_file_path(cache_dir, csv_file_path, METRICS.loader,
+                                 digest)
+    cache = ColumnCache.open(cache_path, digest, TICKET_CACHE_SCHEMA)
+    if cache is not None:
+        print(f"🗄️  Loading {cache.row_count:,} converted rows from "
+              f"{cache_path}; the CSV is not parsed")
+        return cache
+    
+    print(f"🗄️  Building column cache {cache_path}...")
+    try:
+        row_count = build_ticket_cache(csv_file_path, converter, cache_path,
+                                       digest)
+    except (OSError, ValueError, csv.Error, UnicodeDecodeError) as e:
+        print(f"⚠️  Could not build the column cache, parsing the CSV "
+              f"instead: {e}")
+        return None
+    removed = remove_stale_caches(cache_dir, csv_file_path, METRICS.loader,
+                                  cache_path)
+    print(f"✅ Cached {row_count:,} rows"
+          + (f", removed {removed} outdated cache(s)" if removed else ""))
+    return ColumnCache.open(cache_path, digest, TICKET_CACHE_SCHEMA)
+
+
+def cached_chunk(csv_file_path: str, first_index: int, start_offset: int,
+                 rows: List[Tuple], end_offsets: List[int],
+                 failures: Dict[int, List],
+                 known_ticket_ids: Optional[ExistingTicketIndex],
+                 fingerprints: Optional[TicketFingerprints]
+                 ) -> ConvertedChunk:
+    """Build the ConvertedChunk for cached records from ``first_index`` on
+
+    Does what convert_chunk() does for parsed records, minus the
+    conversion. Raw records are re-read from the CSV only if one is
+    dead-lettered.
+    """
+    last_index = first_index + len(rows) - 1
+    last_failure = failures.get(last_index)
+    converted = ConvertedChunk(
+        start_row=first_index + 1,
+        start_offset=start_offset,
+        end_offset=end_offsets[-1],
+        row_count=len(rows),
+        last_ticket_id=last_failure[0] if last_failure else rows[-1][0],
+        rows=[],
+        source_path=csv_file_path,
+    )
+    if known_ticket_ids is None and not failures:
+        add_converted_rows(converted, rows,
+                           list(range(first_index + 1, last_index + 2)),
+                           fingerprints)
+        return converted
     
+    candidates = []
+    row_numbers = []
+    for index, row_data in enumerate(rows, first_index):
+        failure = failures.pop(index, None)
+        ticket_id = row_data[0] if failure is None else failure[0]
+        if (known_ticket_ids is not None and ticket_id is not None
+                and ticket_id in known_ticket_ids):
+            converted.known_rows += 1
+            continue
+        if failure is not None:
+            converted.failed_rows += 1
+            converted.errors.extend(
+                FieldError(index + 1, column, value, reason)
+                for column, value, reason in failure[1])
+            continue
+        candidates.append(row_data)
+        row_numbers.append(index + 1)
+    add_converted_rows(converted, candidates, row_numbers, fingerprints)
+    return converted
+
+
+def stream_cached_chunks(cache: ColumnCache, csv_file_path: str,
+                         chunk_size: Union[int, Callable[[], int]],
+                         start_offset: Optional[int],
+                         known_ticket_ids: Optional[ExistingTicketIndex],
+                         fingerprints: Optional[TicketFingerprints]
+                         ) -> Iterator[ConvertedChunk]:
+    """Yield chunks straight from the column cache, as parsing would
+
+    Rows are rebuilt from whole row groups of columns; groups that end
+    before ``start_offset`` are skipped without being decoded. Row numbers
+    come from each record's position in the file.
+    """
+    next_chunk_size = chunk_size if callable(chunk_size) else (
+        lambda: chunk_size)
+    chunk_offset = max(start_offset or 0, cache.metadata['first_offset'])
+    next_index = None
+    rows: List[Tuple] = []
+    end_offsets: List[int] = []
+    # Conversion failures by record index: (raw ticket_id, errors)
+    failures: Dict[int, List] = {}
+    group_index = 0
+    limit = next_chunk_size()
+    for number, group in enumerate(cache.groups):
+        first_index = group_index
+        group_index += group['rows']
+        skip = 0
+        if next_index is None:
+            if group['extra']['end_offset'] <= chunk_offset:
+                continue
+            *columns, offsets = cache.read_group(number)
+            skip = bisect_right(offsets, chunk_offset)
+            next_index = first_index + skip
+        else:
+            *columns, offsets = cache.read_group(number)
+        for index, ticket_id, errors in group['extra']['failed']:
+            if index >= skip:
+                failures[first_index + index] = [ticket_id, errors]
+        rows.extend(itertools.islice(zip(*columns), skip, None))
+        end_offsets.extend(offsets[skip:])
+        
+        while len(rows) >= limit:
+            chunk_failures = {index: failures.pop(index)
+                              for index in list(failures)
+                              if index < next_index + limit}
+            yield cached_chunk(csv_file_path, next_index, chunk_offset,
+                               rows[:limit], end_offsets[:limit],
+                               chunk_failures, known_ticket_ids,
+                               fingerprints)
+            chunk_offset = end_offsets[limit - 1]
+            next_index += limit
+            del rows[:limit]
+            del end_offsets[:limit]
+            limit = next_chunk_size()
+    
+    if rows:
+        yield cached_chunk(csv_file_path, next_index, chunk_offset, rows,
+                           end_offsets, failures, known_ticket_ids,
+                           fingerprints)
+
+
+# Per-process state of --parse-workers processes, set by start_parse_worker()
+_parse_worker_state = {}
+
+
+def start_parse_worker(header: List[str],
+                       known_ticket_ids: Optional[ExistingTicketIndex],
+                       fingerprints: Optional[TicketFingerprints]) -> None:
+    """Process pool initializer: build the converter once per process"""
+    _parse_worker_state.update(
+        converter=RowConverter(header),
+        known_ticket_ids=known_ticket_ids,
+        fingerprints=fingerprints,
+    )
+
+
+def parse_shard(csv_file_path: str, start: int, end: int,
+                chunk_size: int) -> ParsedShard:
+    """Parse and convert one shard in a worker process
+
+    Rows are numbered from 0 at the start of the shard; the parent renumbers
+    them once it knows how many rows precede the shard.
+    """
+    shard = ParsedShard(start, end, parsed_end=start)
+    chunks = parse_byte_range(csv_file_path, start, end, chunk_size)
+    while True:
+        started = time.perf_counter()
+        chunk = next(chunks, None)
+        read_done = time.perf_counter()
+        shard.read_seconds += read_done - started
+        if chunk is None:
+            return shard
+        converted = convert_chunk(chunk,
+                                  _parse_worker_state['converter'],
+                                  _parse_worker_state['known_ticket_ids'],
+                                  _parse_worker_state['fingerprints'])
+        # Raw records would double what is sent back to the parent
+        converted.source_records = []
+        converted.source_path = csv_file_path
+        shard.chunks.append(converted)
+        shard.parsed_end = chunk.end_offset
+        shard.convert_seconds += time.perf_counter() - read_done
+
+
+def parse_in_processes(csv_file_path: str,
+                       chunk_size: Union[int, Callable[[], int]],
+                       start_offset: Optional[int], start_row: int,
+                       header: List[str],
+                       known_ticket_ids: Optional[ExistingTicketIndex],
+                       fingerprints: Optional[TicketFingerprints],
+                       workers: int) -> Iterator[ConvertedChunk]:
+    """Parse and convert the CSV's shards on ``workers`` processes
+
+    At most two shards per process are in flight. Shards finish in any
+    order but are handed on in file order, so row numbers and checkpoint
+    offsets stay exact; --workers still loads them out of order. A callable
+    ``chunk_size`` is asked again for every shard submitted.
+
+    A stray quote inside an unquoted field can mislead plan_shards(). The
+    shard before such a boundary then stops somewhere else, and the next
+    shard is parsed again from where it really stopped.
+    """
+    with open(csv_file_path, 'rb') as raw_file:
+        lines = OffsetLineReader(raw_file)
+        next(csv.reader(lines))  # header; see read_csv_header()
+        next_offset = max(start_offset or 0, lines.offset)
+    next_row = start_row
+    next_chunk_size = chunk_size if callable(chunk_size) else (
+        lambda: chunk_size)
+    shards = plan_shards(csv_file_path, next_offset)
+    in_flight = deque()
+    
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=start_parse_worker,
+                             initargs=(header, known_ticket_ids,
+                                       fingerprints)) as executor:
+        try:
+            while True:
+                while len(in_flight) < workers * 2:
+                    shard = next(shards, None)
+                    if shard is None:
+                        break
+                    in_flight.append((shard, executor.submit(
+                        parse_shard, csv_file_path, *shard,
+                        next_chunk_size())))
+                if not in_flight:
+                    return
+                
+                (start, end), future = in_flight.popleft()
+                if end <= next_offset:
+                    # An earlier shard already read past this one
+                    future.cancel()
+                    continue
+                if start != next_offset:
+                    future.cancel()
+                    METRICS.increment('shard_realignments')
+                    future = executor.submit(parse_shard, csv_file_path,
+                                             next_offset, end,
+                                             next_chunk_size())
+                parsed = future.result()
+                METRICS.observe('read', parsed.read_seconds,
+                                parsed.row_count)
+                METRICS.observe('convert', parsed.convert_seconds,
+                                parsed.row_count)
+                for chunk in parsed.chunks:
+                    chunk.renumber(next_row)
+                    next_row += chunk.row_count
+                    yield chunk
+                next_offset = parsed.parsed_end
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+
+
+def merge_ticket_rows(conn, rows: List[Tuple], merge_sql: str = MERGE_ROW_SQL,
+                      rejected: Optional[List[Tuple[int, Exception]]] = None
+                      ) -> int:
+    """MERGE rows one at a time and commit them as one unit
+
+    Transient errors propagate so ConnectionPool.run() can replay the whole
+    uncommitted group; any other per-row error skips just that row and adds
+    its (index, error) to ``rejected``.
+    """
+    cursor = conn.cursor()
+    records_imported = 0
+    for index, row_data in enumerate(rows):
+        try:
+            with METRICS.time('send', rows=1):
+                cursor.execute(merge_sql, row_data)
+        except pyodbc.Error as e:
+            if is_transient_error(e):
+                raise
+            if rejected is not None:
+                rejected.append((index, e))
+            continue
+        if cursor.rowcount > 0:
+            records_imported += 1
+    with METRICS.time('commit', rows=len(rows)):
+        conn.commit()
+    cursor.close()
+    return records_imported
+
+
+def import_csv_chunk(chunk: ConvertedChunk, pool: ConnectionPool,
+                     delta: bool = False):
+    """Import a chunk of CSV data with one MERGE round trip per row
+
+    Rows are committed in groups sized by the pool's controller (or of
+    ROW_COMMIT_INTERVAL without one); a group whose connection drops before
+    its commit is replayed on a fresh connection. With ``delta``, existing
+    tickets whose content differs are updated.
+    """
+    records_imported = 0
+    converted_rows = chunk.rows
+    merge_sql = MERGE_ROW_DELTA_SQL if delta else MERGE_ROW_SQL
+    
+    def merge_group(conn, group: List[Tuple]):
+        # Rejections are collected per attempt, so a replayed group does
+        # not dead-letter the same row twice
+        rejected = []
+        return merge_ticket_rows(conn, group, merge_sql, rejected), rejected
+    
+    if not converted_rows:
+        print(f"⏭️  No new rows in chunk ({chunk.known_rows:,} already "
+              f"present, {chunk.failed_rows:,} failed)")
+        return True, 0
+    
+    try:
+        group_start = 0
+        while group_start < len(converted_rows):
+            group_size = (pool.controller.batch_size if pool.controller
+                          else ROW_COMMIT_INTERVAL)
+            group = converted_rows[group_start:group_start + group_size]
+            imported, rejected = pool.run(
+                lambda conn: merge_group(conn, group),
+                f"rows near ticket {group[0][0]}")
+            records_imported += imported
+            for index, error in rejected:
+                chunk.reject(group_start + index, error)
+            group_start += len(group)
+        
+        # Rows that failed conversion or were rejected are neither
+        skipped = chunk.row_count - records_imported - chunk.failed_rows
+        if delta:
+            print(f"✅ Chunk complete: {records_imported:,} records inserted "
+                  f"or updated, {skipped:,} unchanged or skipped, "
+                  f"{chunk.failed_rows:,} rows failed")
+        else:
+            print(f"✅ Chunk complete: {records_imported:,} new records "
+                  f"imported, {skipped:,} duplicates skipped, "
+                  f"{chunk.failed_rows:,} rows failed")
+        
+    except Exception as e:
+        print(f"❌ Error in chunk: {e}")
+        return False, 0
+            
+    return True, records_imported
+
+
+def load_rows_bisecting(pool: ConnectionPool, load_rows,
+                        chunk: ConvertedChunk, start: int, end: int,
+                        description: str) -> int:
+    """Send ``chunk.rows[start:end]`` as one batch, halving it on failure
+
+    ``load_rows(conn, rows)`` must commit its own work and return the rows
+    it loaded. A batch the database refuses outright (a bad value, a
+    constraint) is split in two and each half retried, down to single rows,
+    so one poisoned row costs about log2(batch size) extra round trips
+    rather than a fall back to row-at-a-time. A row that fails on its own is
+    rejected into the chunk's dead letters. Transient errors are replayed by
+    the pool as usual and propagate once it gives up.
+    """
+    rows = chunk.rows[start:end]
+    try:
+        return pool.run(lambda conn: load_rows(conn, rows),
+                        f"{description} starting at row "
+                        f"{chunk.row_numbers[start]}")
+    except pyodbc.Error as e:
+        if is_transient_error(e):
+            raise
+        if end - start == 1:
+            chunk.reject(start, e)
+            return 0
+        METRICS.increment('bisections')
+        middle = (start + end) // 2
+        return (load_rows_bisecting(pool, load_rows, chunk, start, middle,
+                                    description)
+                + load_rows_bisecting(pool, load_rows, chunk, middle, end,
+                                      description))
+
+
+def write_dead_letters(chunk: ConvertedChunk,
+                       dead_letters: DeadLetterFile) -> None:
+    """Write one dead letter per rejected record of a committed chunk"""
+    errors_by_row: Dict[int, List[FieldError]] = {}
+    for error in chunk.errors:
+        errors_by_row.setdefault(error.row_number, []).append(error)
+    for row_number, errors in errors_by_row.items():
+        columns = dict.fromkeys(error.column for error in errors)
+        dead_letters.add(row_number, ', '.join(columns),
+                         '; '.join(error.reason for error in errors),
+                         chunk.source_record(row_number))
+    dead_letters.flush()
+
+
+def merge_ticket_batch(conn, batch_rows: List[Tuple],
+                       merge_sql: str = MERGE_BATCH_SQL) -> int:
+    """Array-bind rows into the session temp table and MERGE them in one go"""
+    cursor = conn.cursor()
+    cursor.fast_executemany = True
+    cursor.execute(CREATE_BATCH_TABLE_SQL)
+    with METRICS.time('send', rows=len(batch_rows)):
+        cursor.executemany(INSERT_BATCH_SQL, batch_rows)
+    with METRICS.time('merge', rows=len(batch_rows)):
+        cursor.execute(merge_sql)
+        records_imported = cursor.fetchone()[0]
+    with METRICS.time('commit', rows=len(batch_rows)):
+        conn.commit()
+    cursor.close()
+    return records_imported
+
+
+def import_csv_batch(chunk: ConvertedChunk, pool: ConnectionPool,
+                     delta: bool = False):
+    """Import a chunk with one array-bound insert and one set-based MERGE
+
+    Rows whose ticket_id already exists in support_tickets (or earlier in the
+    same chunk) are skipped, matching the per-row MERGE semantics. With
+    ``delta``, existing tickets whose content differs are updated instead.
+    """
+    batch_rows = chunk.rows
+    merge_sql = MERGE_BATCH_DELTA_SQL if delta else MERGE_BATCH_SQL
+    if not batch_rows:
+        print(f"⏭️  No new rows in chunk ({chunk.known_rows:,} already "
+              f"present, {chunk.failed_rows:,} failed)")
+        return True, 0
+    
+    try:
+        failed_before = chunk.failed_rows
+        records_imported = load_rows_bisecting(
+            pool, lambda conn, rows: merge_ticket_batch(conn, rows, merge_sql),
+            chunk, 0, len(batch_rows), "batch")
+        rejected = chunk.failed_rows - failed_before
+        
+        duplicates = (len(batch_rows) - records_imported - rejected
+                      + chunk.duplicate_rows + chunk.known_rows)
+        if delta:
+            print(f"✅ Batch complete: {records_imported:,} records inserted "
+                  f"or updated, {duplicates:,} unchanged or duplicate, "
+                  f"{chunk.failed_rows:,} rows failed")
+        else:
+            print(f"✅ Batch complete: {records_imported:,} new records imported, "
+                  f"{duplicates:,} duplicates skipped, "
+                  f"{chunk.failed_rows:,} rows failed")
+        
+    except Exception as e:
+        print(f"❌ Error in batch: {e}")
+        return False, 0
+    
+    return True, records_imported
+
+
+def load_existing_ticket_ids() -> Optional[ExistingTicketIndex]:
+    """Fetch the ticket_ids already loaded, once, at startup"""
     conn = None
-    cursor = None
+    try:
+        print("🗂️  Loading existing ticket_ids from support_tickets...")
+        conn = get_connection()
+        known_ticket_ids = ExistingTicketIndex.load(conn)
+        print(f"✅ {len(known_ticket_ids):,} existing tickets will be "
+              f"skipped client-side")
+        return known_ticket_ids
+    except Exception as e:
+        print(f"❌ Error loading existing ticket_ids: {e}")
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+def prepare_staging_table(keep_existing: bool = False) -> bool:
+    """Create the staging heap if needed and empty it for a fresh load"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(CREATE_STAGING_TABLE_SQL)
+        if not keep_existing:
+            cursor.execute(TRUNCATE_STAGING_TABLE_SQL)
+        conn.commit()
+        print(f"✅ Staging table '{STAGING_TABLE}' ready")
+        return True
+    except Exception as e:
+        print(f"❌ Error preparing staging table: {e}")
+        return False
+    finally:
+        if conn:
+            conn.close()
+
+
+def insert_staging_rows(conn, rows: List[Tuple]) -> int:
+    """Array-bind rows into the staging heap and commit them"""
+    cursor = conn.cursor()
+    cursor.fast_executemany = True
+    with METRICS.time('send', rows=len(rows)):
+        cursor.executemany(INSERT_STAGING_SQL, rows)
+    with METRICS.time('commit', rows=len(rows)):
+        conn.commit()
+    cursor.close()
+    return len(rows)
+
+
+def stage_csv_chunk(chunk: ConvertedChunk, pool: ConnectionPool):
+    """Bulk-insert a converted chunk into the index-free staging table
+
+    A replayed insert can stage a row twice; the final merge keeps only the
+    first occurrence of each ticket_id, so that is harmless.
+    """
+    converted_rows = chunk.rows
+    if not converted_rows:
+        print(f"⏭️  No new rows in chunk ({chunk.known_rows:,} already "
+              f"present, {chunk.failed_rows:,} failed)")
+        return True, 0
+    
+    try:
+        staged = load_rows_bisecting(pool, insert_staging_rows, chunk, 0,
+                                     len(converted_rows), "staging rows")
+        print(f"✅ Staged {staged:,} rows, "
+              f"{chunk.known_rows:,} already present, "
+              f"{chunk.failed_rows:,} rows failed")
+    except Exception as e:
+        print(f"❌ Error staging chunk: {e}")
+        return False, 0
     
+    return True, staged
+
+
+def set_indexes_enabled(cursor, enabled: bool) -> None:
+    """Disable or rebuild the nonclustered support_tickets indexes"""
+    action = 'REBUILD' if enabled else 'DISABLE'
+    for index_name in SUPPORT_TICKET_INDEXES:
+        print(f"   {'🔨 Rebuilding' if enabled else '⏸️  Disabling'} "
+              f"{index_name}")
+        cursor.execute(ALTER_INDEX_SQL.format(index_name=index_name,
+                                              action=action))
+
+
+def rebuild_indexes() -> List[str]:
+    """Rebuild the nonclustered indexes on a fresh connection
+
+    Returns the indexes still disabled afterwards. When that can't be
+    checked, every index is assumed to still be disabled.
+    """
+    try:
+        conn = get_connection()
+    except pyodbc.Error as e:
+        print(f"❌ Could not connect to rebuild indexes: {e}")
+        return list(SUPPORT_TICKET_INDEXES)
+    try:
+        # Index rebuilds outlast the per-statement timeout
+        conn.timeout = 0
+        cursor = conn.cursor()
+        print("🔨 Rebuilding nonclustered indexes...")
+        try:
+            set_indexes_enabled(cursor, True)
+            conn.commit()
+        except pyodbc.Error as e:
+            print(f"❌ Error rebuilding indexes: {e}")
+        try:
+            cursor.execute(DISABLED_INDEXES_SQL)
+            disabled = {row[0] for row in cursor.fetchall()}
+        except pyodbc.Error:
+            return list(SUPPORT_TICKET_INDEXES)
+        return [name for name in SUPPORT_TICKET_INDEXES if name in disabled]
+    finally:
+        conn.close()
+
+
+def merge_staging_table(disable_indexes: bool = False):
+    """Move staged rows into support_tickets with one set-based insert
+
+    With ``disable_indexes`` the six nonclustered indexes are disabled for
+    the insert and rebuilt afterwards, even if the insert fails. The
+    rebuild uses a fresh connection, since a failed insert may have broken
+    the first one, and any index left disabled is named with the statement
+    that rebuilds it.
+    """
+    conn = None
+    records_imported = 0
+    indexes_disabled = False
+    success = True
     try:
-        # Get fresh connection
-        print(f"🔗 Connecting to database for chunk starting at "
-              f"row {start_row}...")
         conn = get_connection()
+        # The set-based insert outlasts the per-statement timeout
+        conn.timeout = 0
         cursor = conn.cursor()
         
-        # Check current record count
-        cursor.execute("SELECT COUNT(*) FROM support_tickets")
-        current_count = cursor.fetchone()[0]
-        print(f"📊 Current database records: {current_count:,}")
+        if disable_indexes:
+            print("⏸️  Disabling nonclustered indexes for the load...")
+            indexes_disabled = True
+            set_indexes_enabled(cursor, False)
+            conn.commit()
         
-        # Prepare MERGE statement to handle duplicates gracefully
-        insert_sql = """
-        MERGE support_tickets AS target
-        USING (VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                      ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)) AS source
-        (ticket_id, day_of_week, day_of_week_num, company_id, company_size,
-         company_size_cat, industry, industry_cat, customer_tier,
-         customer_tier_cat, org_users, region, region_cat, past_30d_tickets,
-         past_90d_incidents, product_area, product_area_cat, booking_channel,
-         booking_channel_cat, reported_by_role, reported_by_role_cat,
-         customers_affected, error_rate_pct, downtime_min, payment_impact_flag,
-         security_incident_flag, data_loss_flag, has_runbook,
-         customer_sentiment, customer_sentiment_cat, description_length,
-         priority, priority_cat)
-        ON target.ticket_id = source.ticket_id
-        WHEN NOT MATCHED THEN
-            INSERT (ticket_id, day_of_week, day_of_week_num, company_id, company_size,
-                   company_size_cat, industry, industry_cat, customer_tier,
-                   customer_tier_cat, org_users, region, region_cat, past_30d_tickets,
-                   past_90d_incidents, product_area, product_area_cat, booking_channel,
-                   booking_channel_cat, reported_by_role, reported_by_role_cat,
-                   customers_affected, error_rate_pct, downtime_min, payment_impact_flag,
-                   security_incident_flag, data_loss_flag, has_runbook,
-                   customer_sentiment, customer_sentiment_cat, description_length,
-                   priority, priority_cat)
-            VALUES (source.ticket_id, source.day_of_week, source.day_of_week_num, 
-                   source.company_id, source.company_size, source.company_size_cat, 
-                   source.industry, source.industry_cat, source.customer_tier,
-                   source.customer_tier_cat, source.org_users, source.region, 
-                   source.region_cat, source.past_30d_tickets, source.past_90d_incidents, 
-                   source.product_area, source.product_area_cat, source.booking_channel,
-                   source.booking_channel_cat, source.reported_by_role, 
-                   source.reported_by_role_cat, source.customers_affected, 
-                   source.error_rate_pct, source.downtime_min, source.payment_impact_flag,
-                   source.security_incident_flag, source.data_loss_flag, 
-                   source.has_runbook, source.customer_sentiment, 
-                   source.customer_sentiment_cat, source.description_length,
-                   source.priority, source.priority_cat);
-        """
+        print(f"🔀 Merging '{STAGING_TABLE}' into support_tickets...")
+        with METRICS.time('merge'):
+            cursor.execute(MERGE_STAGING_SQL)
+            records_imported = cursor.fetchone()[0]
+            conn.commit()
         
-        # Read CSV and process chunk
-        with open(csv_file_path, 'r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
-            
-            # Skip rows until start_row
-            current_row = 1
-            for _ in range(start_row - 1):
-                try:
-                    next(csv_reader)
-                    current_row += 1
-                except StopIteration:
-                    print("✅ Reached end of file")
-                    return True, 0, True
-            
-            # Process chunk
-            records_processed = 0
-            records_imported = 0
+        cursor.execute(DROP_STAGING_TABLE_SQL)
+        conn.commit()
+    except Exception as e:
+        print(f"❌ Error merging staging table: {e}")
+        success = False
+    finally:
+        if conn:
+            conn.close()
+    
+    if indexes_disabled:
+        still_disabled = rebuild_indexes()
+        if still_disabled:
+            print("⚠️  These support_tickets indexes are still DISABLED, "
+                  "so queries can't use them. Rebuild them with:")
+            for index_name in still_disabled:
+                print(f"   ALTER INDEX {index_name} ON support_tickets "
+                      f"REBUILD;")
+    
+    return success, records_imported
+
+
+def save_checkpoint(checkpoint_file: str, checkpoint: ImportCheckpoint) -> None:
+    """Atomically replace the checkpoint file so a crash never truncates it"""
+    temp_file = f"{checkpoint_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as file:
+        json.dump(asdict(checkpoint), file, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file, checkpoint_file)
+
+
+def load_checkpoint(checkpoint_file: str) -> Optional[ImportCheckpoint]:
+    """Load a checkpoint written by save_checkpoint(), if there is one"""
+    if not os.path.exists(checkpoint_file):
+        return None
+    try:
+        with open(checkpoint_file, 'r', encoding='utf-8') as file:
+            return ImportCheckpoint(**json.load(file))
+    except (OSError, ValueError, TypeError) as e:
+        print(f"⚠️  Ignoring unreadable checkpoint {checkpoint_file}: {e}")
+        return None
+
+
+def clear_checkpoint(checkpoint_file: str) -> None:
+    """Remove the checkpoint once the import has fully completed"""
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+
+def checkpoint_after(chunk: ConvertedChunk, csv_file_path: str, mode: str,
+                     records_loaded: int) -> ImportCheckpoint:
+    """Build the checkpoint describing the state after a committed chunk"""
+    stat = os.stat(csv_file_path)
+    return ImportCheckpoint(
+        csv_file=os.path.abspath(csv_file_path),
+        file_size=stat.st_size,
+        file_mtime=stat.st_mtime,
+        mode=mode,
+        byte_offset=chunk.end_offset,
+        next_row=chunk.start_row + chunk.row_count,
+        last_ticket_id=chunk.last_ticket_id,
+        records_loaded=records_loaded,
+    )
+
+
+def start_import_pipeline(csv_file_path: str,
+                          chunk_size: Union[int, Callable[[], int]],
+                          start_offset: Optional[int], start_row: int,
+                          converter: RowConverter,
+                          known_ticket_ids: Optional[ExistingTicketIndex],
+                          fingerprints: Optional[TicketFingerprints],
+                          stop_event: threading.Event,
+                          parse_workers: int = 1,
+                          cache: Optional[ColumnCache] = None
+                          ) -> PipelineStage:
+    """Start the read and convert stages; iterate the result to send
+
+    Reading chunk N+2 and converting chunk N+1 overlap with the database
+    round trips for chunk N, with at most PIPELINE_DEPTH chunks queued
+    between each pair of stages. With ``parse_workers`` above one, both
+    stages run in a pool of processes instead (see parse_in_processes()).
+    With a ``cache``, one stage reads converted rows from it instead.
+    """
+    if cache is not None:
+        reader = PipelineStage(
+            'column-cache',
+            METRICS.timed('read', stream_cached_chunks(
+                cache, csv_file_path, chunk_size, start_offset,
+                known_ticket_ids, fingerprints),
+                rows=lambda chunk: chunk.row_count),
+            lambda chunk: chunk, stop_event)
+        reader.start()
+        return reader
+    if parse_workers > 1:
+        parser = PipelineStage(
+            'csv-parser',
+            parse_in_processes(csv_file_path, chunk_size, start_offset,
+                               start_row, converter.header, known_ticket_ids,
+                               fingerprints, parse_workers),
+            lambda chunk: chunk, stop_event)
+        parser.start()
+        return parser
+    
+    def timed_convert(chunk: CsvChunk) -> ConvertedChunk:
+        with METRICS.time('convert', rows=len(chunk.rows)):
+            return convert_chunk(chunk, converter, known_ticket_ids,
+                                 fingerprints)
+    
+    reader = PipelineStage(
+        'csv-reader',
+        METRICS.timed('read', stream_csv_chunks(
+            csv_file_path, chunk_size, start_offset, start_row),
+            rows=lambda chunk: len(chunk.rows)),
+        lambda chunk: chunk, stop_event)
+    conversion = PipelineStage(
+        'row-converter', iter(reader), timed_convert, stop_event)
+    reader.start()
+    conversion.start()
+    return conversion
+
+
+def run_sequential_import(chunks: Iterator[ConvertedChunk], import_chunk,
+                          pool: ConnectionPool,
+                          progress: ImportProgress) -> bool:
+    """Load chunks one after another, checkpointing each as it commits
+
+    The only pause between chunks is one the pool's controller asks for
+    after the database signalled overload.
+    """
+    for chunk in chunks:
+        print(f"\n📦 Processing chunk starting at row {chunk.start_row:,} "
+              f"(bytes {chunk.start_offset:,}-{chunk.end_offset:,})")
+        
+        success, imported = import_chunk(chunk, pool)
+        
+        if not success:
+            print(f"❌ Failed at row {chunk.start_row} "
+                  f"(byte offset {chunk.start_offset:,})")
+            return False
             
-            for row in csv_reader:
-                if records_processed >= chunk_size:
+        progress.add(chunk, imported)
+        progress.checkpoint(chunk)
+        progress.report()
+        
+        if pool.controller is not None:
+            pool.controller.wait()
+    return True
+
+
+def load_chunk_in_worker(import_chunk, chunk: ConvertedChunk,
+                         pool: ConnectionPool,
+                         worker_stats: Dict[str, WorkerStats],
+                         stats_lock: threading.Lock):
+    """Run one chunk on a pool thread and account for it per worker"""
+    worker_name = threading.current_thread().name
+    try:
+        success, imported = import_chunk(chunk, pool)
+        error = None if success else f"chunk at row {chunk.start_row} failed"
+    except Exception as e:
+        success, imported, error = False, 0, f"row {chunk.start_row}: {e}"
+    
+    with stats_lock:
+        stats = worker_stats.setdefault(worker_name, WorkerStats())
+        if success:
+            stats.chunks_loaded += 1
+            stats.records_imported += imported
+        else:
+            stats.chunks_failed += 1
+            stats.errors.append(error)
+    return success, imported
+
+
+def run_parallel_import(chunks: Iterator[ConvertedChunk], import_chunk,
+                        pool: ConnectionPool, progress: ImportProgress,
+                        workers: int) -> bool:
+    """Load disjoint chunks concurrently on up to ``workers`` threads
+
+    The pool's controller decides how many chunks are in flight, up to
+    ``workers``; without one, two chunks per worker are read ahead. Chunks
+    may commit out of order, so the checkpoint only advances over the
+    contiguous prefix of committed chunks; a resumed run re-sends anything
+    past it, which the skip-if-exists semantics make harmless.
+    """
+    worker_stats: Dict[str, WorkerStats] = {}
+    stats_lock = threading.Lock()
+    in_flight = {}
+    committed = {}
+    next_to_checkpoint = 0
+    failed = False
+    
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix='loader') as executor:
+        numbered_chunks = enumerate(chunks)
+        while True:
+            while not failed and len(in_flight) < (
+                    pool.controller.concurrency if pool.controller
+                    else workers * 2):
+                if pool.controller is not None:
+                    pool.controller.wait()
+                item = next(numbered_chunks, None)
+                if item is None:
                     break
-                    
-                try:
-                    # Prepare row data
-                    row_data = (
-                        int(row['ticket_id']),
-                        row['day_of_week'],
-                        int(row['day_of_week_num']),
-                        int(row['company_id']),
-                        row['company_size'],
-                        int(row['company_size_cat']),
-                        row['industry'],
-                        int(row['industry_cat']),
-                        row['customer_tier'],
-                        int(row['customer_tier_cat']),
-                        int(row['org_users']),
-                        row['region'],
-                        int(row['region_cat']),
-                        int(row['past_30d_tickets']),
-                        int(row['past_90d_incidents']),
-                        row['product_area'],
-                        int(row['product_area_cat']),
-                        row['booking_channel'],
-                        int(row['booking_channel_cat']),
-                        row['reported_by_role'],
-                        int(row['reported_by_role_cat']),
-                        int(row['customers_affected']),
-                        float(row['error_rate_pct']),
-                        int(row['downtime_min']),
-                        int(row['payment_impact_flag']),
-                        int(row['security_incident_flag']),
-                        int(row['data_loss_flag']),
-                        int(row['has_runbook']),
-                        # Handle empty customer_sentiment as NULL
-                        (row['customer_sentiment'].strip()
-                         if row['customer_sentiment'].strip() else None),
-                        int(row['customer_sentiment_cat']),
-                        int(row['description_length']),
-                        row['priority'],
-                        int(row['priority_cat'])
-                    )
-                    
-                    cursor.execute(insert_sql, row_data)
-                    rows_affected = cursor.rowcount
-                    
-                    if rows_affected > 0:
-                        records_imported += 1
-                    # Always count as processed regardless of whether inserted or skipped
-                    
-                    # Commit every 50 records and refresh connection every 500
-                    if (records_processed + 1) % 50 == 0:
-                        try:
-                            conn.commit()
-                            if (records_processed + 1) % 500 == 0:
-                                # Refresh connection every 500 records
-                                cursor.close()
-                                conn.close()
-                                print(f"🔄 Refreshing connection at record {records_processed + 1}")
-                                conn = get_connection()
-                                cursor = conn.cursor()
-                        except Exception as conn_error:
-                            print(f"⚠️  Connection issue at record {records_processed + 1}: {conn_error}")
-                            # Try to reconnect
-                            try:
-                                cursor.close()
-                                conn.close()
-                            except Exception:
-                                pass
-                            conn = get_connection()
-                            cursor = conn.cursor()
-                        
-                except Exception as e:
-                    print(f"❌ Error processing row {current_row}: {e}")
-                    print(f"Row sample: {dict(list(row.items())[:3])}")
-                    # Skip problematic rows but continue
-                    pass
-                
-                records_processed += 1
-                current_row += 1
-            
-            # Final commit
-            try:
-                conn.commit()
-            except Exception as final_commit_error:
-                print(f"⚠️  Final commit error: {final_commit_error}")
+                sequence, chunk = item
+                future = executor.submit(
+                    load_chunk_in_worker, import_chunk, chunk, pool,
+                    worker_stats, stats_lock)
+                in_flight[future] = (sequence, chunk)
             
-            print(f"✅ Chunk complete: {records_imported:,} new records imported, {records_processed - records_imported:,} duplicates skipped")
+            if not in_flight:
+                break
             
-    except Exception as e:
-        print(f"❌ Error in chunk: {e}")
-        return False, 0, False
-    finally:
-        # Clean up connections
-        try:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-        except Exception:
-            pass
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                sequence, chunk = in_flight.pop(future)
+                success, imported = future.result()
+                if not success:
+                    print(f"❌ Failed at row {chunk.start_row} "
+                          f"(byte offset {chunk.start_offset:,})")
+                    failed = True
+                    continue
+                progress.add(chunk, imported)
+                committed[sequence] = chunk
             
-    return True, records_imported, False  # False = not end of file
+            while next_to_checkpoint in committed:
+                progress.checkpoint(committed.pop(next_to_checkpoint))
+                next_to_checkpoint += 1
+            progress.report()
+    
+    print("\n👷 Worker summary:")
+    for worker_name, stats in sorted(worker_stats.items()):
+        print(f"   {worker_name}: {stats.chunks_loaded:,} chunks, "
+              f"{stats.records_imported:,} imported, "
+              f"{stats.chunks_failed:,} failed")
+        for error in stats.errors:
+            print(f"      ❌ {error}")
+    
+    return not failed
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse and return command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Import Support_tickets.csv into the support_tickets table."
+    )
+    parser.add_argument("--csv-file",
+                        help="Path to the tickets CSV, or a .zip/.gz "
+                             "containing it (default: data/Support_tickets"
+                             ".csv next to this script, falling back to "
+                             "data/Support_tickets.zip).")
+    parser.add_argument("--mode", choices=["row", "batch", "staging"],
+                        default="row",
+                        help="row: one MERGE round trip per ticket; "
+                             "batch: one array-bound insert and one "
+                             "set-based MERGE per chunk; "
+                             "staging: bulk-load an index-free staging "
+                             "table, then one set-based insert for the "
+                             "whole file (default: row).")
+    parser.add_argument("--disable-indexes", action="store_true",
+                        help="In staging mode, disable the nonclustered "
+                             "support_tickets indexes during the final "
+                             "insert and rebuild them afterwards.")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="Rows per chunk/batch to start with; batch and "
+                             "staging modes adapt it from there "
+                             "(default: 1000).")
+    parser.add_argument("--max-chunk-size", type=int,
+                        default=DEFAULT_MAX_CHUNK_SIZE,
+                        help="Largest chunk the adaptive controller may grow "
+                             f"to (default: {DEFAULT_MAX_CHUNK_SIZE}).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Load chunks concurrently on up to this many "
+                             "threads, each with its own pooled connection "
+                             "(default: 1, sequential).")
+    parser.add_argument("--target-latency", type=float,
+                        default=DEFAULT_TARGET_LATENCY_SECONDS,
+                        help="Commit latency, in seconds, that chunks and "
+                             "row groups may grow up to; slower commits "
+                             "shrink them (default: "
+                             f"{DEFAULT_TARGET_LATENCY_SECONDS:g}).")
+    parser.add_argument("--no-adaptive", action="store_true",
+                        help="Keep the chunk size, row commit interval and "
+                             "worker count fixed; only pauses after "
+                             "timeouts, deadlocks and throttling remain.")
+    parser.add_argument("--control-log",
+                        help="Append every adaptive control decision to "
+                             "this JSON-lines file.")
+    parser.add_argument("--parse-workers", type=int, default=1,
+                        help="Parse and convert the CSV in this many "
+                             "processes, each taking a record-aligned byte "
+                             "range; needs an uncompressed CSV (default: 1, "
+                             "parsed on a thread of this process).")
+    parser.add_argument("--cache", action="store_true",
+                        help="Load converted rows from a columnar cache of "
+                             "the CSV, built on first use and rebuilt "
+                             "whenever the file's SHA-256 changes.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Where --cache keeps its files (default: "
+                             ".csv-cache next to this script).")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="Load existing ticket_ids once at startup and "
+                             "drop rows that are already present before "
+                             "they reach the database.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the last committed chunk "
+                             "recorded in the checkpoint file.")
+    parser.add_argument("--checkpoint-file", default=DEFAULT_CHECKPOINT_FILE,
+                        help="Where committed progress is recorded "
+                             "(default: .import-support-tickets.checkpoint"
+                             ".json next to this script).")
+    parser.add_argument("--delta", action="store_true",
+                        help="Sync changes: skip rows whose content is "
+                             "unchanged since the last delta run and update "
+                             "tickets that differ, instead of only inserting "
+                             "new ones (row and batch modes).")
+    parser.add_argument("--fingerprint-file", default=DEFAULT_FINGERPRINT_FILE,
+                        help="Where --delta records row fingerprints "
+                             "(default: .import-support-tickets.fingerprints"
+                             ".json next to this script).")
+    parser.add_argument("--dead-letter-file", default=DEFAULT_DEAD_LETTER_FILE,
+                        help="Where rejected rows are written with their "
+                             "record number, field and reason; .csv "
+                             "(replayable with "
+                             "--csv-file) or .jsonl (default: "
+                             ".import-support-tickets.dead-letter.csv next "
+                             "to this script).")
+    parser.add_argument("--metrics-json",
+                        help="Write per-stage timings, latency percentiles "
+                             "and rows/sec as JSON to this path.")
+    parser.add_argument("--metrics-prometheus",
+                        help="Write the same metrics as a Prometheus "
+                             "textfile-collector file to this path.")
+    return parser.parse_args()
 
 
 def main():
     """Main function with chunked import"""
+    args = parse_arguments()
+    if args.chunk_size < 1:
+        print("❌ --chunk-size must be at least 1")
+        return
+    if args.workers < 1:
+        print("❌ --workers must be at least 1")
+        return
+    if args.parse_workers < 1:
+        print("❌ --parse-workers must be at least 1")
+        return
+    if args.max_chunk_size < args.chunk_size:
+        print("❌ --max-chunk-size must be at least --chunk-size")
+        return
+    if args.target_latency <= 0:
+        print("❌ --target-latency must be positive")
+        return
+    if args.disable_indexes and args.mode != "staging":
+        print("❌ --disable-indexes is only supported with --mode staging")
+        return
+    if args.delta and args.mode == "staging":
+        print("❌ --delta is only supported with --mode row or batch")
+        return
+    if args.delta and args.skip_existing:
+        print("❌ --delta and --skip-existing cannot be combined; delta mode "
+              "needs existing tickets to detect changes")
+        return
+    if not load_configuration():
+        sys.exit(1)
+    
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_file_path = os.path.join(script_dir, "data", "Support_tickets.csv")
+    csv_file_path = args.csv_file or os.path.join(
+        script_dir, "data", "Support_tickets.csv")
     
     print("🚀 Robust CSV Import - Processing in chunks")
     print("=" * 50)
     print(f"📁 Looking for CSV file at: {csv_file_path}")
     
+    resolved_path = resolve_csv_path(csv_file_path)
+    if resolved_path is None:
+        print(f"❌ Error: CSV file not found at {csv_file_path}")
+        return
+    if resolved_path != csv_file_path:
+        print(f"📦 Streaming compressed input: {resolved_path}")
+    csv_file_path = resolved_path
+    if args.parse_workers > 1 and is_compressed(csv_file_path):
+        # Every shard would have to decompress the file up to its start
+        print("ℹ️  --parse-workers needs an uncompressed CSV; parsing in "
+              "one process")
+        args.parse_workers = 1
+    if os.path.abspath(args.dead_letter_file) == os.path.abspath(csv_file_path):
+        print("❌ --dead-letter-file must differ from --csv-file; move the "
+              "rejected rows aside before replaying them")
+        return
+    
+    # Map column positions once; every row is then converted positionally
+    try:
+        header = read_csv_header(csv_file_path)
+        converter = RowConverter(header)
+    except (OSError, StopIteration, ValueError, csv.Error) as e:
+        print(f"❌ Error reading CSV header: {e}")
+        return
+    
     # Import in smaller chunks to avoid connection timeouts
-    chunk_size = 1000  # Reduced from 5000 to 1000
-    start_row = 1
+    chunk_size = args.chunk_size
+    import_chunk = {
+        "row": import_csv_chunk,
+        "batch": import_csv_batch,
+        "staging": stage_csv_chunk,
+    }[args.mode]
+    if args.delta:
+        import_chunk = functools.partial(import_chunk, delta=True)
+    print(f"⚙️  Mode: {args.mode}{' (delta)' if args.delta else ''}, "
+          f"chunk size: {chunk_size:,}")
+    
+    # Batch and staging modes adapt the chunk size; row mode adapts its
+    # commit groups and keeps reading fixed-size chunks
+    control_settings = dict(
+        max_concurrency=args.workers, target_latency=args.target_latency,
+        metrics=METRICS, concurrency_label="workers",
+        adaptive=not args.no_adaptive, log_path=args.control_log)
+    if args.mode == "row":
+        controller = AdaptiveController(
+            "import_support_tickets", ROW_COMMIT_INTERVAL,
+            MAX_ROW_COMMIT_INTERVAL, batch_label="commit group",
+            **control_settings)
+    else:
+        controller = AdaptiveController(
+            "import_support_tickets", chunk_size, args.max_chunk_size,
+            batch_label="chunk size", **control_settings)
+    if controller.adaptive:
+        print(f"🎛️  Adaptive control: {controller.batch_label} up to "
+              f"{controller.max_batch_size:,}, up to {args.workers} "
+              f"workers, target commit latency {args.target_latency:g}s")
     total_imported = 0
+    start_offset = None
+    start_row = 1
     
-    while True:
-        print(f"\n📦 Processing chunk starting at row {start_row:,}")
-        
-        success, imported, end_of_file = import_csv_chunk(
-            csv_file_path, start_row, chunk_size)
-        
-        if not success:
-            print(f"❌ Failed at row {start_row}")
-            break
-            
-        total_imported += imported
-        
-        if end_of_file:
-            print("✅ All data processed!")
-            break
-            
-        start_row += chunk_size
-        
-        # Brief pause between chunks
-        print("⏳ Pausing between chunks...")
-        time.sleep(2)
+    checkpoint = load_checkpoint(args.checkpoint_file) if args.resume else None
+    if args.resume and checkpoint is None:
+        print("ℹ️  No checkpoint found, starting from the beginning")
+    elif checkpoint is not None:
+        if not checkpoint.matches_file(csv_file_path):
+            print(f"❌ Checkpoint {args.checkpoint_file} was written for a "
+                  f"different or modified CSV file; rerun without --resume")
+            return
+        if checkpoint.mode != args.mode:
+            print(f"❌ Checkpoint was written by --mode {checkpoint.mode}; "
+                  f"resume with the same mode")
+            return
+        start_offset = checkpoint.byte_offset
+        start_row = checkpoint.next_row
+        total_imported = checkpoint.records_loaded
+        print(f"⏩ Resuming at row {start_row:,} (byte offset "
+              f"{start_offset:,}, after ticket_id "
+              f"{checkpoint.last_ticket_id})")
+    
+    # Cached rows are already converted, so --parse-workers has no work
+    cache = None
+    if args.cache:
+        cache = open_ticket_cache(csv_file_path, converter, args.cache_dir)
+    if args.parse_workers > 1 and cache is None:
+        print(f"🧮 Parsing with {args.parse_workers} processes")
+    
+    known_ticket_ids = None
+    if args.skip_existing:
+        known_ticket_ids = load_existing_ticket_ids()
+        if known_ticket_ids is None:
+            return
+    
+    fingerprints = None
+    if args.delta:
+        fingerprints = TicketFingerprints.load(
+            args.fingerprint_file,
+            f"{CONNECTION_PARAMS['server']}/{CONNECTION_PARAMS['database']}")
+        print(f"🔍 Delta sync: {len(fingerprints):,} ticket fingerprints "
+              f"from previous runs")
+    
+    if args.mode == "staging" and not prepare_staging_table(
+            keep_existing=checkpoint is not None):
+        return
+    
+    # A resumed run keeps the rows rejected before it stopped
+    dead_letters = DeadLetterFile(args.dead_letter_file, header,
+                                  append=checkpoint is not None)
+    progress = ImportProgress(csv_file_path, args.mode, args.checkpoint_file,
+                              total_imported, fingerprints, start_offset or 0,
+                              dead_letters)
+    pool = ConnectionPool(args.workers, controller)
+    
+    # Single streaming pass: each chunk carries the byte range it was read
+    # from, so a later run can seek straight to a chunk boundary. Reading
+    # and conversion run on their own threads ahead of the send stage; in
+    # batch and staging modes each new chunk takes the controller's size.
+    stop_event = threading.Event()
+    if args.mode != "row":
+        chunk_size = functools.partial(getattr, controller, "batch_size")
+    chunks = start_import_pipeline(csv_file_path, chunk_size, start_offset,
+                                   start_row, converter, known_ticket_ids,
+                                   fingerprints, stop_event,
+                                   args.parse_workers, cache)
+    try:
+        if args.workers > 1:
+            print(f"👷 Loading with {args.workers} workers")
+            completed = run_parallel_import(chunks, import_chunk, pool,
+                                            progress, args.workers)
+        else:
+            completed = run_sequential_import(chunks, import_chunk, pool,
+                                              progress)
+    except (OSError, csv.Error, UnicodeDecodeError) as e:
+        print(f"❌ Error reading CSV file: {e}")
+        completed = False
+    finally:
+        stop_event.set()
+        pool.close()
+        if fingerprints is not None:
+            fingerprints.save()
+        if cache is not None:
+            # The reading stage must let go of the mapping first
+            chunks.join()
+            cache.close()
+    total_imported = progress.records_loaded
+    
+    if completed:
+        print("✅ All data processed!")
+        if args.mode == "staging":
+            staged = total_imported
+            success, total_imported = merge_staging_table(args.disable_indexes)
+            if success:
+                print(f"✅ Staged {staged:,} rows: {total_imported:,} new "
+                      f"records imported, {staged - total_imported:,} "
+                      f"duplicates skipped")
+                clear_checkpoint(args.checkpoint_file)
+        else:
+            clear_checkpoint(args.checkpoint_file)
     
     print("\n🎉 Import Summary:")
     print(f"   ✅ Total records imported: {total_imported:,}")
+    if dead_letters.count:
+        print(f"   🚫 Rejected rows: {dead_letters.count:,}, written to "
+              f"{args.dead_letter_file}")
+    
+    METRICS.set_rows_loaded(total_imported)
+    controller.print_summary()
+    METRICS.print_summary()
+    if args.metrics_json:
+        METRICS.write_json(args.metrics_json)
+        print(f"📝 Metrics written to {args.metrics_json}")
+    if args.metrics_prometheus:
+        METRICS.write_prometheus(args.metrics_prometheus)
+        print(f"📝 Prometheus metrics written to {args.metrics_prometheus}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,256 @@
+"""
+Adaptive batch size and concurrency shared by the CSV loaders.
+
+A fixed batch size, worker count and pause between batches suits one
+database tier and is wrong for the rest. An ``AdaptiveController`` tunes
+them from what the target reports, the way TCP tunes its window: batch
+size and concurrency double until the first sign of pressure (slow start),
+then grow additively while requests finish under the latency target (and,
+for Cosmos DB, the request-charge target), with multiplicative decrease on
+timeouts, deadlocks and throttling. A back-off also pauses new work for the
+delay the server asked for, which replaces the loaders' old fixed sleeps.
+
+Every change is printed with the measurement behind it, and can be appended
+to a JSON-lines log, so the targets can be tuned from real runs.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from load_metrics import LoadMetrics
+
+# A decision is taken every this many requests, or one per unit of
+# concurrency if that is more, so each window sees every request in flight
+# settle; back-offs inside the same window are merged. Windows are counted,
+# not timed, so short loads adapt as readily as long ones.
+WINDOW = 5
+# Multiplicative decrease on failure, and the gentler one when a window
+# simply runs over its targets
+BACK_OFF_FACTOR = 0.5
+EASE_OFF_FACTOR = 0.75
+# Additive increase of the batch size after slow start, as a fraction of
+# the starting size
+GROWTH_FRACTION = 0.25
+
+
+class AdaptiveController:
+    """AIMD control of batch size and concurrency for one loader run
+
+    Loaders call ``record()`` after each successful unit of work and
+    ``back_off()`` when the target signals overload, then read
+    ``batch_size`` and ``concurrency`` before sizing the next unit. With
+    ``adaptive`` off both stay fixed, but back-off pauses still apply.
+
+    By default the first failure shrinks everything at once. With a
+    ``tolerated_failure_rate``, failures only pause; settings shrink when
+    more than that share of recent units failed. Recent means the last
+    ``1 / tolerated_failure_rate`` units, so at 5% one failure in 20 is
+    tolerated however small the window it lands in.
+    """
+
+    def __init__(self, name: str, batch_size: int, max_batch_size: int,
+                 max_concurrency: int = 1, target_latency: float = 2.0,
+                 target_charge_per_second: Optional[float] = None,
+                 metrics: Optional[LoadMetrics] = None,
+                 charge_counter: str = 'request_charge',
+                 batch_label: str = 'batch size',
+                 concurrency_label: str = 'concurrency',
+                 tolerated_failure_rate: float = 0.0,
+                 adaptive: bool = True, log_path: Optional[str] = None):
+        self.name = name
+        self.batch_size = min(batch_size, max_batch_size)
+        self.min_batch_size = 1
+        self.max_batch_size = max_batch_size
+        self.batch_step = max(1, int(batch_size * GROWTH_FRACTION))
+        # Concurrency starts low and earns its way up; fixed runs use all
+        self.concurrency = 1 if adaptive else max_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.target_charge_per_second = target_charge_per_second
+        self.metrics = metrics
+        self.charge_counter = charge_counter
+        self.batch_label = batch_label
+        self.concurrency_label = concurrency_label
+        self.tolerated_failure_rate = tolerated_failure_rate
+        self.adaptive = adaptive
+        self.log_path = log_path
+        self.adjustments = 0
+        self._slow_start = True
+        self._latencies: List[float] = []
+        self._window_started = time.monotonic()
+        self._window_charge = self._charge_total()
+        self._backed_off_in_window = False
+        self._failures = 0
+        self._failure_reason = ''
+        # Whether each recent unit failed, for tolerated_failure_rate
+        self._outcomes: Deque[bool] = deque(maxlen=max(
+            WINDOW, math.ceil(1 / tolerated_failure_rate)
+            if tolerated_failure_rate else 0))
+        self._pause_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Account for one unit of work that succeeded in ``seconds``"""
+        with self._lock:
+            self._latencies.append(seconds)
+            self._outcomes.append(False)
+            self._evaluate_if_window_full()
+
+    def back_off(self, reason: str, delay: float = 0.0) -> None:
+        """Shrink after a timeout, deadlock or throttled request
+
+        ``delay`` is how long the server asked callers to wait; nothing new
+        starts until it has passed. Concurrent failures caused by the same
+        overload land in one window and are acted on only once.
+        """
+        with self._lock:
+            self._pause_until = max(self._pause_until,
+                                    time.monotonic() + delay)
+            self._failures += 1
+            self._failure_reason = reason
+            self._outcomes.append(True)
+            if (not self.tolerated_failure_rate
+                    and not self._backed_off_in_window):
+                self._shrink(reason)
+            # A window of nothing but failures must still be judged
+            self._evaluate_if_window_full()
+
+    def pause_remaining(self) -> float:
+        """Seconds to hold off before starting new work"""
+        return max(0.0, self._pause_until - time.monotonic())
+
+    def wait(self) -> None:
+        """Sleep out any pause a back-off asked for"""
+        delay = self.pause_remaining()
+        if delay:
+            print(f"⏳ Pausing {delay:.1f}s as the server asked...")
+            time.sleep(delay)
+
+    def print_summary(self) -> None:
+        """Print where the settings ended up, for tuning the next run"""
+        if not self.adaptive:
+            return
+        print(f"🎛️  {self.name}: settled at {self.batch_label} "
+              f"{self.batch_size:,}, {self.concurrency_label} "
+              f"{self.concurrency} after {self.adjustments} adjustments")
+
+    def _charge_total(self) -> float:
+        if self.metrics is None:
+            return 0.0
+        return self.metrics.counter(self.charge_counter)
+
+    def _shrink(self, reason: str) -> None:
+        self._backed_off_in_window = True
+        self._slow_start = False
+        self._adjust(
+            max(self.min_batch_size, int(self.batch_size * BACK_OFF_FACTOR)),
+            max(1, int(self.concurrency * BACK_OFF_FACTOR)),
+            'back off', reason)
+
+    def _evaluate_if_window_full(self) -> None:
+        if (len(self._latencies) + self._failures
+                >= max(WINDOW, self.concurrency)):
+            self._evaluate_window()
+
+    def _evaluate_window(self) -> None:
+        latencies = sorted(self._latencies)
+        elapsed = max(time.monotonic() - self._window_started, 1e-9)
+        charge_total = self._charge_total()
+        charge_rate = (charge_total - self._window_charge) / elapsed
+        backed_off = self._backed_off_in_window
+        failures = self._failures
+        self._latencies = []
+        self._window_started = time.monotonic()
+        self._window_charge = charge_total
+        self._backed_off_in_window = False
+        self._failures = 0
+        if backed_off:
+            # Let the smaller settings prove themselves first
+            return
+        recent_failures = sum(self._outcomes)
+        if failures and (recent_failures > self.tolerated_failure_rate
+                         * self._outcomes.maxlen):
+            self._shrink(f"{recent_failures} of the last "
+                         f"{len(self._outcomes)} {self._failure_reason}")
+            # The next window judges the new settings afresh
+            self._backed_off_in_window = False
+            self._outcomes.clear()
+            return
+
+        if not latencies:
+            return
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        over_latency = p95 > self.target_latency
+        over_charge = (self.target_charge_per_second is not None
+                       and charge_rate > self.target_charge_per_second)
+        measured = (f"p95 {p95 * 1000:,.0f}ms, target "
+                    f"{self.target_latency * 1000:,.0f}ms")
+        if self.target_charge_per_second is not None:
+            measured += (f"; {charge_rate:,.0f} RU/s, target "
+                         f"{self.target_charge_per_second:,.0f}")
+        if over_latency or over_charge:
+            # Latency follows batch size; request charge per second
+            # follows concurrency
+            self._slow_start = False
+            batch_size = self.batch_size
+            concurrency = self.concurrency
+            if over_latency:
+                batch_size = max(self.min_batch_size,
+                                 int(batch_size * EASE_OFF_FACTOR))
+            if over_charge:
+                concurrency = max(1, int(concurrency * EASE_OFF_FACTOR))
+            self._adjust(batch_size, concurrency, 'ease off', measured)
+        else:
+            if self._slow_start:
+                batch_size = self.batch_size * 2
+                concurrency = self.concurrency * 2
+            else:
+                batch_size = self.batch_size + self.batch_step
+                concurrency = self.concurrency + 1
+            self._adjust(min(self.max_batch_size, batch_size),
+                         min(self.max_concurrency, concurrency),
+                         'grow', measured)
+
+    def _adjust(self, batch_size: int, concurrency: int, decision: str,
+                reason: str) -> None:
+        if not self.adaptive:
+            if decision == 'back off':
+                self._log(decision, reason)
+            return
+        if (batch_size, concurrency) == (self.batch_size, self.concurrency):
+            return
+        changes = []
+        if batch_size != self.batch_size:
+            changes.append(f"{self.batch_label} {self.batch_size:,} → "
+                           f"{batch_size:,}")
+        if concurrency != self.concurrency:
+            changes.append(f"{self.concurrency_label} {self.concurrency} → "
+                           f"{concurrency}")
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.adjustments += 1
+        if self.metrics is not None:
+            self.metrics.increment(
+                'control_increases' if decision == 'grow'
+                else 'control_decreases')
+        print(f"🎛️  {decision.capitalize()}: {', '.join(changes)} ({reason})")
+        self._log(decision, reason)
+
+    def _log(self, decision: str, reason: str) -> None:
+        if self.log_path is None:
+            return
+        entry = {
+            'time': time.time(),
+            'loader': self.name,
+            'decision': decision,
+            'reason': reason,
+            'batch_size': self.batch_size,
+            'concurrency': self.concurrency,
+            'pause_seconds': round(self.pause_remaining(), 3),
+        }
+        with open(self.log_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(entry) + '\n')
@@ -0,0 +1,252 @@
+"""
+Per-stage timing and throughput accounting shared by the CSV loaders.
+
+import-support-tickets-csv.py and upload-defects-csv.py each keep one
+``LoadMetrics`` for the run. Every stage (read, convert/transform, send,
+commit, connect, ...) records how long each unit of work took and how many
+rows it covered. Latencies go into fixed log-scale histograms, so memory stays
+constant however long the run is and p50/p95/p99 cost nothing to keep.
+
+At the end of a run the metrics can be printed, written as a JSON summary,
+and written as a Prometheus textfile for node_exporter's textfile collector.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Histogram buckets grow by 10% from 10µs, which covers up to ~17 minutes
+# with every percentile accurate to within 10%
+BUCKET_BASE_SECONDS = 1e-5
+BUCKET_GROWTH = 1.1
+BUCKET_COUNT = 194
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency distribution with constant memory"""
+
+    def __init__(self):
+        self.counts = [0] * (BUCKET_COUNT + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        if seconds <= BUCKET_BASE_SECONDS:
+            index = 0
+        else:
+            index = min(BUCKET_COUNT, 1 + int(
+                math.log(seconds / BUCKET_BASE_SECONDS, BUCKET_GROWTH)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                upper = BUCKET_BASE_SECONDS * BUCKET_GROWTH ** index
+                return min(upper, self.max)
+        return self.max
+
+
+class StageMetrics:
+    """Accumulated time, work units and rows for one stage"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.rows = 0
+
+    def summary(self) -> Dict[str, float]:
+        seconds = self.latency.total
+        return {
+            'count': self.latency.count,
+            'rows': self.rows,
+            'seconds': round(seconds, 6),
+            'rows_per_second': round(self.rows / seconds, 1) if seconds else 0.0,
+            **{f'p{int(q * 100)}_seconds': round(self.latency.quantile(q), 6)
+               for q in QUANTILES},
+            'max_seconds': round(self.latency.max, 6),
+        }
+
+
+class LoadMetrics:
+    """Thread-safe per-stage metrics for one loader run"""
+
+    def __init__(self, loader: str):
+        self.loader = loader
+        self.started_at = time.monotonic()
+        self.stages: Dict[str, StageMetrics] = {}
+        self.counters: Dict[str, float] = {}
+        self.rows_loaded = 0
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, rows: int = 0) -> None:
+        """Record one unit of work for ``stage``"""
+        with self._lock:
+            metrics = self.stages.get(stage)
+            if metrics is None:
+                metrics = self.stages[stage] = StageMetrics()
+            metrics.latency.observe(seconds)
+            metrics.rows += rows
+
+    @contextmanager
+    def time(self, stage: str, rows: int = 0):
+        """Time the body of a ``with`` block as one unit of ``stage``"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, rows)
+
+    def timed(self, stage: str, items: Iterable[T],
+              rows: Callable[[T], int] = lambda item: 1) -> Iterator[T]:
+        """Yield from ``items``, timing how long each one took to produce"""
+        iterator = iter(items)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe(stage, time.perf_counter() - started, rows(item))
+            yield item
+
+    def increment(self, counter: str, amount: float = 1) -> None:
+        """Add to a run-wide counter such as retries or request charge"""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def counter(self, counter: str) -> float:
+        """Current value of a run-wide counter; 0 until first incremented"""
+        with self._lock:
+            return self.counters.get(counter, 0)
+
+    def set_rows_loaded(self, rows: int) -> None:
+        """Record the run's final count of rows written to the target"""
+        with self._lock:
+            self.rows_loaded = rows
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def summary(self) -> Dict:
+        """Everything recorded so far as a JSON-ready dict"""
+        with self._lock:
+            elapsed = self.elapsed()
+            return {
+                'loader': self.loader,
+                'elapsed_seconds': round(elapsed, 3),
+                'rows_loaded': self.rows_loaded,
+                'rows_per_second': round(self.rows_loaded / elapsed, 1)
+                if elapsed else 0.0,
+                'stages': {name: stage.summary()
+                           for name, stage in self.stages.items()},
+                'counters': dict(self.counters),
+            }
+
+    def print_summary(self) -> None:
+        """Print the per-stage table shown at the end of a run"""
+        summary = self.summary()
+        print(f"\n⏱️  Stage timings ({summary['elapsed_seconds']:,.1f}s wall, "
+              f"{summary['rows_per_second']:,.0f} rows/sec loaded):")
+        for name, stage in summary['stages'].items():
+            print(f"   {name:<10} {stage['seconds']:>9,.2f}s "
+                  f"{stage['count']:>8,} ops  "
+                  f"p50 {stage['p50_seconds'] * 1000:,.1f}ms  "
+                  f"p95 {stage['p95_seconds'] * 1000:,.1f}ms  "
+                  f"p99 {stage['p99_seconds'] * 1000:,.1f}ms")
+        for name, value in summary['counters'].items():
+            print(f"   {name}: {value:,.2f}".rstrip('0').rstrip('.'))
+
+    def write_json(self, path: str) -> None:
+        _write_atomically(path, json.dumps(self.summary(), indent=2) + '\n')
+
+    def write_prometheus(self, path: str) -> None:
+        """Write a node_exporter textfile-collector file
+
+        Each file describes one finished run and is replaced by the next, so
+        totals are exposed as gauges without the ``_total`` suffix Prometheus
+        reserves for counters that only ever grow
+        """
+        summary = self.summary()
+        loader = f'loader="{self.loader}"'
+        lines = [
+            '# HELP csv_loader_rows_loaded Rows written by the last run.',
+            '# TYPE csv_loader_rows_loaded gauge',
+            f'csv_loader_rows_loaded{{{loader}}} {summary["rows_loaded"]}',
+            '# HELP csv_loader_elapsed_seconds Wall time of the last run.',
+            '# TYPE csv_loader_elapsed_seconds gauge',
+            f'csv_loader_elapsed_seconds{{{loader}}} '
+            f'{summary["elapsed_seconds"]}',
+            '# HELP csv_loader_stage_seconds Time spent per stage and quantile.',
+            '# TYPE csv_loader_stage_seconds summary',
+        ]
+        for name, stage in summary['stages'].items():
+            labels = f'{loader},stage="{name}"'
+            for q in QUANTILES:
+                lines.append(f'csv_loader_stage_seconds{{{labels},'
+                             f'quantile="{q}"}} '
+                             f'{stage[f"p{int(q * 100)}_seconds"]}')
+            lines.append(f'csv_loader_stage_seconds_sum{{{labels}}} '
+                         f'{stage["seconds"]}')
+            lines.append(f'csv_loader_stage_seconds_count{{{labels}}} '
+                         f'{stage["count"]}')
+        lines += [
+            '# HELP csv_loader_stage_rows Rows handled per stage by the last '
+            'run.',
+            '# TYPE csv_loader_stage_rows gauge',
+        ]
+        lines += [f'csv_loader_stage_rows{{{loader},stage="{name}"}} '
+                  f'{stage["rows"]}'
+                  for name, stage in summary['stages'].items()]
+        for name, value in summary['counters'].items():
+            metric = f'csv_loader_{name}'
+            lines += [f'# HELP {metric} Run-wide {name} at the end of the '
+                      f'last run.',
+                      f'# TYPE {metric} gauge',
+                      f'{metric}{{{loader}}} {value}']
+        _write_atomically(path, '\n'.join(lines) + '\n')
+
+
+def estimate_remaining(done: float, total: Optional[float],
+                       elapsed: float) -> Optional[float]:
+    """Seconds left at the average rate so far, if it can be estimated"""
+    if not total or done <= 0 or elapsed <= 0:
+        return None
+    return max(total - done, 0) * elapsed / done
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Render an ETA such as ``1h02m`` or ``45s``"""
+    if seconds is None:
+        return 'unknown'
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def _write_atomically(path: str, text: str) -> None:
+    """Replace ``path`` so readers never see a half-written file"""
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(temp_file, path)
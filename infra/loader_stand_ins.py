@@ -0,0 +1,603 @@
+"""
+In-process stand-ins for Azure SQL (via pyodbc) and Azure Cosmos DB.
+
+benchmark-loaders.py installs these in ``sys.modules`` before it loads
+import-support-tickets-csv.py or upload-defects-csv.py, so the loaders' real
+code paths run on one machine without any Azure resources. Every request to
+the stand-ins counts as one round trip. Each round trip waits out a
+configurable latency, and can fail with a transient disconnect or, for
+Cosmos DB, an HTTP 429 carrying a retry-after delay. Both can also reject
+a fixed share of rows or documents outright, so a batch that carries one
+fails the way the real driver or SDK reports it.
+
+The stand-ins only count the rows they are sent. They keep no copy of the
+data, so the peak memory of a benchmark run is the loader's own.
+"""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+import types
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Stand-in RU charges; real charges depend on document size and indexing
+UPSERT_REQUEST_CHARGE = 10.0
+BATCH_OPERATION_CHARGE = 7.5
+MAX_BATCH_OPERATIONS = 100
+# Counters that annotate requests rather than being requests themselves
+NON_REQUEST_COUNTERS = {'documents_written', 'disconnects', 'throttled',
+                        'rejected'}
+# Status the real service gives the other operations of a failed batch
+FAILED_DEPENDENCY = 424
+
+
+@dataclass
+class FaultProfile:
+    """Latency and failure rates applied to every round trip"""
+    latency_ms: float = 1.0
+    # Fraction of round trips that fail as a dropped connection
+    disconnect_rate: float = 0.0
+    # Fraction of Cosmos DB requests rejected with HTTP 429
+    throttle_rate: float = 0.0
+    retry_after_ms: float = 10.0
+    seed: int = 0
+    # Fraction of SQL rows and Cosmos DB documents rejected as invalid (a
+    # constraint violation, HTTP 400). The choice depends only on the
+    # ticket or document id, so a rejected row is rejected again however
+    # often it is resent.
+    reject_rate: float = 0.0
+    # Cosmos DB throughput in RU/s, 0 for unlimited. As on the service,
+    # requests beyond it are throttled with a 429 whose retry-after is when
+    # enough RUs have accrued, so the load a client can sustain is capped.
+    provisioned_ru_per_second: float = 0.0
+
+
+class RoundTrips:
+    """Thread-safe count of requests seen by the stand-ins, by kind"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[name] += amount
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+    def total(self) -> int:
+        """Requests sent to either stand-in, retries included"""
+        return sum(count for name, count in self.summary().items()
+                   if name not in NON_REQUEST_COUNTERS)
+
+
+class FaultInjector:
+    """Applies a FaultProfile's latency and random failures"""
+
+    def __init__(self, profile: FaultProfile, round_trips: RoundTrips):
+        self.profile = profile
+        self.round_trips = round_trips
+        self.latency = profile.latency_ms / 1000
+        self._random = random.Random(profile.seed)
+        self._lock = threading.Lock()
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def is_rejected(self, key) -> bool:
+        """True for the rows or documents the stand-ins refuse to store"""
+        rate = self.profile.reject_rate
+        if rate <= 0:
+            return False
+        return zlib.crc32(str(key).encode('utf-8')) < rate * 2 ** 32
+
+    def wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    async def wait_async(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+# --- pyodbc ---------------------------------------------------------------
+
+class FakeSqlServer:
+    """Shared state behind every fake pyodbc connection"""
+
+    def __init__(self, faults: FaultInjector):
+        self.faults = faults
+        self.round_trips = faults.round_trips
+        self.lock = threading.Lock()
+        self.rows_committed = 0
+        self.staging_rows = 0
+
+
+def build_fake_pyodbc(server: FakeSqlServer) -> types.ModuleType:
+    """A ``pyodbc`` module whose connections talk to ``server``
+
+    Statements are recognised by the shape of the loader's SQL: per-row
+    MERGE, array-bound inserts into the batch temp table or the staging
+    heap, and the set-based merges that follow them. Writes only count once
+    committed, so rows replayed after a disconnect are not double-counted.
+    """
+    module = types.ModuleType('pyodbc')
+
+    class Error(Exception):
+        pass
+
+    class DatabaseError(Error):
+        pass
+
+    class OperationalError(DatabaseError):
+        pass
+
+    class ProgrammingError(DatabaseError):
+        pass
+
+    class IntegrityError(DatabaseError):
+        pass
+
+    class InterfaceError(Error):
+        pass
+
+    def disconnected() -> OperationalError:
+        return OperationalError(
+            '08S01', '[08S01] Communication link failure (10054)')
+
+    def check_rows(rows) -> None:
+        # Ticket rows start with their ticket_id
+        for row in rows:
+            if server.faults.is_rejected(row[0]):
+                server.round_trips.add('rejected')
+                raise IntegrityError(
+                    '23000', f'[23000] The INSERT statement conflicted with '
+                             f'a CHECK constraint for ticket {row[0]} (547)')
+
+    class Cursor:
+        def __init__(self, connection: 'Connection'):
+            self.connection = connection
+            self.fast_executemany = False
+            self.rowcount = -1
+            self._results: List[tuple] = []
+
+        def execute(self, sql: str, *params):
+            self.connection.round_trip('execute')
+            if len(params) == 1 and isinstance(params[0], (list, tuple)):
+                params = params[0]
+            self._results = []
+            self.rowcount = -1
+            statement = ' '.join(sql.split())
+            connection = self.connection
+            if statement.startswith('SELECT 1'):
+                self._results = [(1,)]
+            elif statement.startswith('SELECT ticket_id FROM support_tickets'):
+                # The target starts empty on every benchmark run
+                self._results = []
+            elif 'MERGE' in statement and params:
+                check_rows([params])
+                connection.pending_rows += 1
+                self.rowcount = 1
+            elif 'MERGE' in statement:
+                # Set-based merge of the session's batch temp table
+                merged = connection.temp_rows
+                connection.temp_rows = 0
+                connection.pending_rows += merged
+                self._results = [(merged,)]
+            elif 'INSERT INTO support_tickets' in statement:
+                # Final move of the staging heap into the target table
+                with server.lock:
+                    staged = server.staging_rows
+                    server.staging_rows = 0
+                connection.pending_rows += staged
+                self._results = [(staged,)]
+            elif statement.startswith('CREATE TABLE #'):
+                connection.temp_rows = 0
+            return self
+
+        def executemany(self, sql: str, seq_of_params) -> None:
+            rows = len(seq_of_params)
+            self.connection.round_trip('executemany')
+            check_rows(seq_of_params)
+            if ' #' in sql:
+                self.connection.temp_rows += rows
+            else:
+                self.connection.pending_staging_rows += rows
+
+        def fetchone(self):
+            return self._results.pop(0) if self._results else None
+
+        def fetchmany(self, size: int) -> List[tuple]:
+            rows, self._results = self._results[:size], self._results[size:]
+            return rows
+
+        def fetchall(self) -> List[tuple]:
+            rows, self._results = self._results, []
+            return rows
+
+        def close(self) -> None:
+            pass
+
+    class Connection:
+        def __init__(self):
+            self.server = server
+            self.timeout = 0
+            self.autocommit = False
+            self.broken = False
+            self.pending_rows = 0
+            self.pending_staging_rows = 0
+            self.temp_rows = 0
+
+        def round_trip(self, name: str) -> None:
+            if self.broken:
+                raise disconnected()
+            server.round_trips.add(name)
+            server.faults.wait()
+            if server.faults.roll(server.faults.profile.disconnect_rate):
+                server.round_trips.add('disconnects')
+                self.broken = True
+                self.rollback_pending()
+                raise disconnected()
+
+        def rollback_pending(self) -> None:
+            self.pending_rows = 0
+            self.pending_staging_rows = 0
+
+        def cursor(self) -> Cursor:
+            return Cursor(self)
+
+        def commit(self) -> None:
+            self.round_trip('commit')
+            with server.lock:
+                server.rows_committed += self.pending_rows
+                server.staging_rows += self.pending_staging_rows
+            self.rollback_pending()
+
+        def rollback(self) -> None:
+            if self.broken:
+                raise disconnected()
+            self.rollback_pending()
+            self.temp_rows = 0
+
+        def close(self) -> None:
+            self.broken = True
+
+    def connect(connection_string: str, **kwargs) -> Connection:
+        server.round_trips.add('connect')
+        server.faults.wait()
+        return Connection()
+
+    module.Error = Error
+    module.DatabaseError = DatabaseError
+    module.OperationalError = OperationalError
+    module.ProgrammingError = ProgrammingError
+    module.IntegrityError = IntegrityError
+    module.InterfaceError = InterfaceError
+    module.connect = connect
+    return module
+
+
+# --- azure.cosmos -----------------------------------------------------------
+
+class HttpResponseError(Exception):
+    """Stands in for ``azure.core.exceptions.HttpResponseError``"""
+
+    def __init__(self, message: str = '', response=None, **kwargs):
+        super().__init__(message)
+        self.message = message
+        self.response = response
+        self.status_code: Optional[int] = None
+
+
+class CosmosHttpResponseError(HttpResponseError):
+    """Mirrors the attributes the loaders read from the real exception"""
+
+    def __init__(self, status_code: Optional[int] = None, message: str = '',
+                 headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class CosmosResourceExistsError(CosmosHttpResponseError):
+    pass
+
+
+class CosmosBatchOperationError(HttpResponseError):
+    """Raised for a batch with a failing operation; like the real SDK's, it
+    is not a CosmosHttpResponseError"""
+
+    def __init__(self, error_index: int, headers: Dict[str, str],
+                 status_code: int, message: str,
+                 operation_responses: List[Dict]):
+        super().__init__(message)
+        self.error_index = error_index
+        self.headers = headers
+        self.status_code = status_code
+        self.operation_responses = operation_responses
+
+
+class FakeCosmosAccount:
+    """Shared state behind the sync and async fake Cosmos DB clients
+
+    A dropped connection is retried inside the real SDK before the caller
+    sees it, so here a disconnect costs an extra round trip instead of
+    raising. Throttling does surface, as the SDK's own 429 retries are
+    exhausted quickly under sustained load and the loaders handle it.
+    """
+
+    def __init__(self, faults: FaultInjector):
+        self.faults = faults
+        self.round_trips = faults.round_trips
+        self.partition_keys: Dict[str, Dict] = {}
+        # RUs left in the current second; a request may overdraw them, and
+        # the next ones are throttled until the debt is repaid
+        self._ru_available = faults.profile.provisioned_ru_per_second
+        self._ru_updated = time.monotonic()
+        self._ru_lock = threading.Lock()
+
+    def check_request(self, name: str) -> bool:
+        """Count a request; True if it hit a disconnect and must be resent"""
+        self.round_trips.add(name)
+        if self.faults.roll(self.faults.profile.disconnect_rate):
+            self.round_trips.add('disconnects')
+            return True
+        if self.faults.roll(self.faults.profile.throttle_rate):
+            self.round_trips.add('throttled')
+            raise CosmosHttpResponseError(
+                429, 'Request rate is large',
+                {'x-ms-retry-after-ms':
+                 str(self.faults.profile.retry_after_ms)})
+        return False
+
+    def spend(self, charge: float) -> None:
+        """Charge a request against the provisioned throughput"""
+        rate = self.faults.profile.provisioned_ru_per_second
+        if rate <= 0:
+            return
+        with self._ru_lock:
+            now = time.monotonic()
+            self._ru_available = min(
+                rate, self._ru_available + (now - self._ru_updated) * rate)
+            self._ru_updated = now
+            if self._ru_available >= 0:
+                self._ru_available -= charge
+                return
+            retry_after_ms = -self._ru_available / rate * 1000
+        self.round_trips.add('throttled')
+        raise CosmosHttpResponseError(
+            429, 'Request rate is large',
+            {'x-ms-retry-after-ms': f'{retry_after_ms:.0f}'})
+
+    def write(self, operations: int, response_hook, charge: float):
+        self.round_trips.add('documents_written', operations)
+        if response_hook is not None:
+            response_hook({'x-ms-request-charge': str(charge)}, None)
+
+    def is_rejected(self, document: Dict) -> bool:
+        return self.faults.is_rejected(document.get('id', ''))
+
+    def check_document(self, document: Dict) -> None:
+        if self.is_rejected(document):
+            self.round_trips.add('rejected')
+            raise CosmosHttpResponseError(
+                400, f"Document {document.get('id')} was rejected")
+
+    def check_batch(self, batch_operations: List) -> None:
+        if len(batch_operations) > MAX_BATCH_OPERATIONS:
+            raise CosmosHttpResponseError(
+                400, f'Batch of {len(batch_operations)} operations exceeds '
+                     f'the limit of {MAX_BATCH_OPERATIONS}')
+        for index, (_, args) in enumerate(batch_operations):
+            if self.is_rejected(args[0]):
+                # As the service does, the first failure fails the batch and
+                # every other operation reports a failed dependency
+                self.round_trips.add('rejected')
+                responses = [{'statusCode': FAILED_DEPENDENCY}
+                             for _ in batch_operations]
+                responses[index] = {'statusCode': 400}
+                raise CosmosBatchOperationError(
+                    index, {}, 400,
+                    f'Batch operation {index} was rejected', responses)
+
+
+class FakeContainer:
+    def __init__(self, account: FakeCosmosAccount, container_id: str):
+        self.account = account
+        self.id = container_id
+
+    def read(self) -> Dict:
+        self.account.round_trips.add('read')
+        self.account.faults.wait()
+        return {'id': self.id,
+                'partitionKey': self.account.partition_keys[self.id]}
+
+    def _request(self, name: str) -> None:
+        self.account.faults.wait()
+        while self.account.check_request(name):
+            self.account.faults.wait()
+
+    def upsert_item(self, body: Dict, response_hook=None, **kwargs) -> Dict:
+        self._request('upsert')
+        self.account.spend(UPSERT_REQUEST_CHARGE)
+        self.account.check_document(body)
+        self.account.write(1, response_hook, UPSERT_REQUEST_CHARGE)
+        return body
+
+    def create_item(self, body: Dict, response_hook=None, **kwargs) -> Dict:
+        self._request('create')
+        self.account.spend(UPSERT_REQUEST_CHARGE)
+        self.account.check_document(body)
+        self.account.write(1, response_hook, UPSERT_REQUEST_CHARGE)
+        return body
+
+    def execute_item_batch(self, batch_operations: List, partition_key=None,
+                           response_hook=None, **kwargs) -> List[Dict]:
+        self._request('batch')
+        self.account.spend(BATCH_OPERATION_CHARGE * len(batch_operations))
+        self.account.check_batch(batch_operations)
+        self.account.write(len(batch_operations), response_hook,
+                           BATCH_OPERATION_CHARGE * len(batch_operations))
+        return [{'statusCode': 200} for _ in batch_operations]
+
+
+class FakeAsyncContainer(FakeContainer):
+    async def read(self) -> Dict:
+        self.account.round_trips.add('read')
+        await self.account.faults.wait_async()
+        return {'id': self.id,
+                'partitionKey': self.account.partition_keys[self.id]}
+
+    async def _request_async(self, name: str) -> None:
+        await self.account.faults.wait_async()
+        while self.account.check_request(name):
+            await self.account.faults.wait_async()
+
+    async def upsert_item(self, body: Dict, response_hook=None,
+                          **kwargs) -> Dict:
+        await self._request_async('upsert')
+        self.account.spend(UPSERT_REQUEST_CHARGE)
+        self.account.check_document(body)
+        self.account.write(1, response_hook, UPSERT_REQUEST_CHARGE)
+        return body
+
+    async def create_item(self, body: Dict, response_hook=None,
+                          **kwargs) -> Dict:
+        await self._request_async('create')
+        self.account.spend(UPSERT_REQUEST_CHARGE)
+        self.account.check_document(body)
+        self.account.write(1, response_hook, UPSERT_REQUEST_CHARGE)
+        return body
+
+    async def execute_item_batch(self, batch_operations: List,
+                                 partition_key=None, response_hook=None,
+                                 **kwargs) -> List[Dict]:
+        await self._request_async('batch')
+        self.account.spend(BATCH_OPERATION_CHARGE * len(batch_operations))
+        self.account.check_batch(batch_operations)
+        self.account.write(len(batch_operations), response_hook,
+                           BATCH_OPERATION_CHARGE * len(batch_operations))
+        return [{'statusCode': 200} for _ in batch_operations]
+
+
+def build_fake_cosmos(
+        account: FakeCosmosAccount) -> Dict[str, types.ModuleType]:
+    """``azure.cosmos`` and ``azure.identity`` modules backed by ``account``"""
+
+    class FakeDatabase:
+        def __init__(self, container_type):
+            self.container_type = container_type
+
+        def create_container_if_not_exists(self, id: str, partition_key: Dict,
+                                           **kwargs):
+            account.round_trips.add('control')
+            account.partition_keys.setdefault(id, partition_key)
+            return self.container_type(account, id)
+
+    class FakeAsyncDatabase(FakeDatabase):
+        async def create_container_if_not_exists(self, id: str,
+                                                 partition_key: Dict,
+                                                 **kwargs):
+            return FakeDatabase.create_container_if_not_exists(
+                self, id, partition_key)
+
+    class CosmosClient:
+        def __init__(self, url: str, credential=None, **kwargs):
+            self.url = url
+
+        def list_databases(self):
+            account.round_trips.add('control')
+            return iter(())
+
+        def create_database_if_not_exists(self, id: str, **kwargs):
+            account.round_trips.add('control')
+            return FakeDatabase(FakeContainer)
+
+    class AsyncCosmosClient:
+        def __init__(self, url: str, credential=None, **kwargs):
+            self.url = url
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+        async def create_database_if_not_exists(self, id: str, **kwargs):
+            account.round_trips.add('control')
+            return FakeAsyncDatabase(FakeAsyncContainer)
+
+    class DefaultAzureCredential:
+        def __init__(self, **kwargs):
+            pass
+
+        def close(self) -> None:
+            pass
+
+    class AsyncDefaultAzureCredential(DefaultAzureCredential):
+        async def close(self) -> None:
+            pass
+
+    azure = types.ModuleType('azure')
+    core = types.ModuleType('azure.core')
+    core_exceptions = types.ModuleType('azure.core.exceptions')
+    cosmos = types.ModuleType('azure.cosmos')
+    exceptions = types.ModuleType('azure.cosmos.exceptions')
+    cosmos_aio = types.ModuleType('azure.cosmos.aio')
+    identity = types.ModuleType('azure.identity')
+    identity_aio = types.ModuleType('azure.identity.aio')
+    core_exceptions.HttpResponseError = HttpResponseError
+    core.exceptions = core_exceptions
+    exceptions.CosmosHttpResponseError = CosmosHttpResponseError
+    exceptions.CosmosResourceExistsError = CosmosResourceExistsError
+    exceptions.CosmosBatchOperationError = CosmosBatchOperationError
+    cosmos.CosmosClient = CosmosClient
+    cosmos.exceptions = exceptions
+    cosmos.aio = cosmos_aio
+    cosmos_aio.CosmosClient = AsyncCosmosClient
+    identity.DefaultAzureCredential = DefaultAzureCredential
+    identity.aio = identity_aio
+    identity_aio.DefaultAzureCredential = AsyncDefaultAzureCredential
+    azure.core = core
+    azure.cosmos = cosmos
+    azure.identity = identity
+    return {
+        'azure': azure,
+        'azure.core': core,
+        'azure.core.exceptions': core_exceptions,
+        'azure.cosmos': cosmos,
+        'azure.cosmos.exceptions': exceptions,
+        'azure.cosmos.aio': cosmos_aio,
+        'azure.identity': identity,
+        'azure.identity.aio': identity_aio,
+    }
+
+
+class StandIns:
+    """Both stand-ins, sharing one fault profile and round-trip count"""
+
+    def __init__(self, profile: FaultProfile):
+        self.round_trips = RoundTrips()
+        faults = FaultInjector(profile, self.round_trips)
+        self.sql_server = FakeSqlServer(faults)
+        self.cosmos_account = FakeCosmosAccount(faults)
+
+    def install(self) -> None:
+        """Replace pyodbc and the Azure SDK modules for this process"""
+        sys.modules['pyodbc'] = build_fake_pyodbc(self.sql_server)
+        sys.modules.update(build_fake_cosmos(self.cosmos_account))
+
+    def rows_written(self) -> int:
+        """Rows committed to SQL plus documents accepted by Cosmos DB"""
+        return (self.sql_server.rows_committed
+                + self.round_trips.summary().get('documents_written', 0))